@@ -0,0 +1,97 @@
+import copy
+import tracemalloc
+
+import pytest
+from VisualLibrary import VisualLibrary
+
+from ojs.xmlgenerator import OjsArticle, OjsIssue
+from tests.test_XmlGeneration import TEST_DATA_DIRECTORY, MockConfigurator
+
+DEFAULT_PAYLOAD_SIZE = 16 * 1024
+SYNTHETIC_ARTICLE_COUNTS = [10, 100, 1000]
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--payload-size",
+        type=int,
+        default=DEFAULT_PAYLOAD_SIZE,
+        help="The size in bytes of the dummy file of every synthetic article.",
+    )
+
+
+@pytest.fixture(scope="session")
+def payload_size(request):
+    return request.config.getoption("--payload-size")
+
+
+@pytest.fixture(scope="session")
+def template_configuration():
+    return MockConfigurator().get_template_configuration()
+
+
+@pytest.fixture(scope="session")
+def vl_article():
+    xml_test_file = "{base_dir}/generator-test-article.xml".format(
+        base_dir=TEST_DATA_DIRECTORY
+    )
+    return VisualLibrary().get_element_from_xml_file(xml_test_file)
+
+
+@pytest.fixture(scope="session")
+def synthetic_vl_articles(vl_article, payload_size):
+    """Returns a function creating copies of the test article with dummy files of the configured size."""
+
+    payload = b"%PDF" * (payload_size // 4)
+
+    def create_synthetic_vl_articles(article_count):
+        synthetic_vl_articles = []
+        for article_number in range(article_count):
+            synthetic_vl_article = copy.copy(vl_article)
+            synthetic_vl_article.id = "{id}{number}".format(
+                id=vl_article.id, number=article_number
+            )
+            synthetic_vl_article.files = [copy.copy(file) for file in vl_article.files]
+            for file in synthetic_vl_article.files:
+                file.data = payload
+                file.size = len(payload)
+
+            synthetic_vl_articles.append(synthetic_vl_article)
+
+        return synthetic_vl_articles
+
+    return create_synthetic_vl_articles
+
+
+def create_synthetic_ojs_issue(vl_articles, template_configuration) -> OjsIssue:
+    """Creates an issue the same way OjsIssue does for a Visual Library issue."""
+
+    ojs_issue = OjsIssue(template_configuration=template_configuration)
+    ojs_issue.id = "1"
+    ojs_issue.volume_number = "1"
+    ojs_issue.issue_number = "1"
+    ojs_issue.publication_year = "1942"
+    ojs_issue.articles = [
+        OjsArticle(vl_article, template_configuration) for vl_article in vl_articles
+    ]
+    ojs_issue.add_languages_of_vl_articles(vl_articles)
+
+    return ojs_issue
+
+
+def measure_peak_memory(function, *args) -> dict:
+    """Runs the function once and returns the peak of the Python memory traced while it runs.
+    This is done outside of the timed runs, because tracing the memory slows down the function.
+
+    The peak RSS is not reported: the operating system only tracks the peak of the whole process,
+    which earlier stages and fixtures have already raised.
+    """
+
+    tracemalloc.start()
+    try:
+        function(*args)
+        _, peak_traced_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"peak_traced_memory": peak_traced_memory}
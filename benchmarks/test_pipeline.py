@@ -0,0 +1,100 @@
+import pytest
+
+from benchmarks.conftest import (
+    SYNTHETIC_ARTICLE_COUNTS,
+    create_synthetic_ojs_issue,
+    measure_peak_memory,
+)
+from ojs.xmlgenerator import XmlGenerator
+
+PRETTY_PRINTERS = [
+    XmlGenerator.PRETTY_PRINTER_LXML,
+    XmlGenerator.PRETTY_PRINTER_MINIDOM,
+]
+
+
+@pytest.fixture(
+    scope="module", params=SYNTHETIC_ARTICLE_COUNTS, ids="{}-articles".format
+)
+def synthetic_issue(request, synthetic_vl_articles, template_configuration):
+    """Returns the Visual Library articles, the OJS issue and its rendered XML for a number of articles."""
+
+    vl_articles = synthetic_vl_articles(request.param)
+    ojs_issue = create_synthetic_ojs_issue(vl_articles, template_configuration)
+
+    template, configuration = ojs_issue._prepare_xml_generation_and_get_template()
+    rendered_xml_string = template.render(configuration)
+
+    return vl_articles, ojs_issue, template, configuration, rendered_xml_string
+
+
+def run_stage(benchmark, stage, function, *args):
+    benchmark.group = stage
+    benchmark.extra_info.update(measure_peak_memory(function, *args))
+    return benchmark.pedantic(function, args=args, rounds=3, iterations=1)
+
+
+def test_object_construction(benchmark, synthetic_issue, template_configuration):
+    vl_articles = synthetic_issue[0]
+
+    ojs_issue = run_stage(
+        benchmark,
+        "object-construction",
+        create_synthetic_ojs_issue,
+        vl_articles,
+        template_configuration,
+    )
+
+    assert len(ojs_issue.articles) == len(vl_articles)
+
+
+def test_template_render(benchmark, synthetic_issue):
+    _, _, template, configuration, _ = synthetic_issue
+
+    xml_string = run_stage(benchmark, "template-render", template.render, configuration)
+
+    assert xml_string
+
+
+@pytest.mark.parametrize("pretty_printer", PRETTY_PRINTERS)
+def test_pretty_print(benchmark, synthetic_issue, pretty_printer):
+    _, ojs_issue, _, _, rendered_xml_string = synthetic_issue
+    ojs_issue.pretty_printer = pretty_printer
+
+    xml_string = run_stage(
+        benchmark,
+        "pretty-print-{pretty}".format(pretty=pretty_printer),
+        ojs_issue._prettify_xml,
+        rendered_xml_string,
+    )
+
+    assert xml_string
+
+
+def test_write(benchmark, synthetic_issue, tmp_path):
+    rendered_xml_string = synthetic_issue[4]
+    output_file_path = tmp_path / "issue.xml"
+
+    def write_xml():
+        with open(str(output_file_path), "w") as output_file:
+            output_file.write(rendered_xml_string)
+
+    run_stage(benchmark, "write", write_xml)
+
+    assert output_file_path.stat().st_size > 0
+
+
+def test_streamed_render_and_write(benchmark, synthetic_issue, tmp_path):
+    _, ojs_issue, template, configuration, _ = synthetic_issue
+    output_file_path = tmp_path / "issue.xml"
+
+    def stream_xml():
+        with open(str(output_file_path), "w") as output_file:
+            for chunk in ojs_issue._remove_empty_lines_from_xml_stream(
+                template.generate(configuration)
+            ):
+                output_file.write(chunk)
+
+    run_stage(benchmark, "streamed-render-and-write", stream_xml)
+
+    assert output_file_path.stat().st_size > 0
@@ -0,0 +1,37 @@
+import pytest
+from VisualLibrary import VisualLibrary
+
+from ojs.xmlgenerator import OjsXmlGenerator, XmlGenerator
+from tests.test_XmlGeneration import (
+    TEST_DATA_DIRECTORY,
+    MockConfigurator,
+    add_dummy_data_to_all_articles,
+)
+
+PRETTY_PRINTERS = sorted(XmlGenerator.PRETTY_PRINTERS)
+
+
+@pytest.fixture(scope="module")
+def ojs_issue_and_rendered_xml():
+    xml_test_file = "{base_dir}/generator-test-issue.xml".format(
+        base_dir=TEST_DATA_DIRECTORY
+    )
+    vl_issue = VisualLibrary().get_element_from_xml_file(xml_test_file)
+
+    ojs_xml_generator = OjsXmlGenerator(MockConfigurator())
+    ojs_issue = ojs_xml_generator.convert_vl_objecto_to_ojs_object(vl_issue)
+    add_dummy_data_to_all_articles(ojs_issue.articles)
+
+    template, configuration = ojs_issue._prepare_xml_generation_and_get_template()
+    return ojs_issue, template.render(configuration)
+
+
+@pytest.mark.parametrize("pretty_printer", PRETTY_PRINTERS)
+def test_pretty_printing(benchmark, ojs_issue_and_rendered_xml, pretty_printer):
+    ojs_issue, rendered_xml_string = ojs_issue_and_rendered_xml
+    ojs_issue.pretty_printer = pretty_printer
+
+    benchmark.group = "pretty-printing"
+    prettified_xml_string = benchmark(ojs_issue._prettify_xml, rendered_xml_string)
+
+    assert prettified_xml_string
@@ -0,0 +1,67 @@
+import pathlib
+import subprocess
+import sys
+
+ROOT_DIRECTORY_PATH = pathlib.Path(__file__).parents[1]
+# The cumulative import time of the exporter's entry point in microseconds, as given by `python -X importtime`
+STARTUP_BUDGET_MICROSECONDS = 150 * 1000
+# The modules only imported when the first item is exported
+DEFERRED_MODULES = [
+    "VisualLibrary",
+    "jinja2",
+    "lxml.etree",
+    "ojs.xmlgenerator",
+    "requests",
+    "xml.dom.minidom",
+]
+
+
+def measure_import_times(module_name: str) -> dict:
+    """Imports the given module in a fresh interpreter and returns the cumulative import time
+    of every imported module in microseconds.
+    """
+
+    import_statement = "import {module_name}".format(module_name=module_name)
+    completed_process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", import_statement],
+        cwd=str(ROOT_DIRECTORY_PATH),
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+    import_times = {}
+    for line in completed_process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_time, imported_module_name = line.split("|")
+        import_times[imported_module_name.strip()] = int(cumulative_time)
+
+    return import_times
+
+
+def test_exporter_import_time(benchmark):
+    benchmark.group = "startup"
+    import_times = benchmark.pedantic(
+        measure_import_times, args=("ojs.exporter",), rounds=5, iterations=1
+    )
+
+    benchmark.extra_info["import_time_microseconds"] = import_times["ojs.exporter"]
+    assert import_times["ojs.exporter"] < STARTUP_BUDGET_MICROSECONDS
+    assert not [
+        module_name for module_name in DEFERRED_MODULES if module_name in import_times
+    ]
+
+
+def test_exporter_help(benchmark):
+    benchmark.group = "startup"
+    completed_process = benchmark.pedantic(
+        subprocess.run,
+        args=([sys.executable, "-m", "ojs.exporter", "--help"],),
+        kwargs=dict(cwd=str(ROOT_DIRECTORY_PATH), stdout=subprocess.DEVNULL),
+        rounds=5,
+        iterations=1,
+    )
+
+    assert completed_process.returncode == 0
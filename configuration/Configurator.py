@@ -1,14 +1,26 @@
 import configparser
 import json
+import os
+
+from configuration.ItemSource import ItemSource
 
 
 class Configurator:
     """ A class to handle the configuration file. """
 
+    KEYWORD_BYTECODE_CACHE_DIRECTORY = 'template_bytecode_cache_directory'
+    KEYWORD_FILE_BASE_URL = 'file_base_url'
+    KEYWORD_FILE_DIRECTORY = 'file_directory'
+    KEYWORD_FILE_EMBEDDING = 'file_embedding'
     KEYWORD_ITEM_FILE = 'itemFile'
     KEYWORD_ITEMS = 'items'
     KEYWORD_LANGUAGES = 'languages'
+    KEYWORD_LOG_LEVEL = 'log_level'
+    KEYWORD_NAMESPACE_FILE_IDS = 'namespace_file_ids'
     KEYWORD_PRE_SCHEMA = 'use_pre_3_2_schema'
+    KEYWORD_PRETTY = 'pretty'
+    KEYWORD_RENDERER = 'renderer'
+    KEYWORD_TITLE_PREFIXES = 'title_prefixes'
 
     SECTION_DEFAULT = 'DEFAULT'
     SECTION_GENERAL = 'General'
@@ -18,10 +30,26 @@ class Configurator:
     def __init__(self):
         self._configuration = configparser.ConfigParser()
 
-        self.items = set()
+        self.items = []
         self.languages = []
+        self.log_level = None
+        self._template_configuration = None
+
+    @classmethod
+    def from_template_configuration(cls, template_configuration: dict):
+        """ Creates a configurator providing an already parsed template configuration, e.g. in a worker process.
+            :param template_configuration: The result of `get_template_configuration` of a parsed configurator.
+            :type template_configuration: dict
+        """
+
+        configurator = cls()
+        configurator._template_configuration = dict(template_configuration)
+        configurator.languages = list(template_configuration.get(cls.KEYWORD_LANGUAGES) or [])
+        return configurator
 
     def get_configuration(self):
+        """ Returns the parsed configuration. The items are the ItemSource, which reads them when iterated. """
+
         configuration = {
             self.KEYWORD_ITEMS: self.items,
             self.KEYWORD_LANGUAGES: self.languages,
@@ -33,6 +61,9 @@ class Configurator:
         return configuration
 
     def get_template_configuration(self):
+        if self._template_configuration is not None:
+            return dict(self._template_configuration)
+
         def convert_to_elemental(value):
             if value.lower() in ['true', 'false']:
                 return value.lower() == 'true'
@@ -49,41 +80,44 @@ class Configurator:
 
         return template_configuration
 
-    def parse_configuration(self, config_file_path='config.ini'):
+    def parse_configuration(self, config_file_path='config.ini', item_file_path=None):
         """ Reads an INI-configuration file.
             :param config_file_path: The path to the configuration file. Default is "config.ini"
             :type config_file_path: Path or str
+            :param item_file_path: If given, the items are read from this file instead of the configured ones.
+            With "-", they are read from the standard input.
+            :type item_file_path: Path or str
             :except: If no list with objects to download is given, a ValueError is thrown.
+
+            The items are not read here: `items` is an ItemSource streaming them in order, when it is iterated.
         """
 
         self._configuration.read(str(config_file_path))
 
-        item_list_string = self._configuration[self.SECTION_PROCESS].get(self.KEYWORD_ITEMS, None)
-        if item_list_string is None:
-            try:
-                item_list_string = self._read_items_from_external_file(
-                    self._configuration[self.SECTION_PROCESS][self.KEYWORD_ITEM_FILE]
+        item_list_string = self._configuration.get(self.SECTION_PROCESS, self.KEYWORD_ITEMS, fallback=None)
+        if item_file_path is None and item_list_string is not None:
+            self.items = ItemSource.from_string(item_list_string)
+        else:
+            if item_file_path is None:
+                item_file_path = self._configuration.get(
+                    self.SECTION_PROCESS, self.KEYWORD_ITEM_FILE,
+                    fallback=self._configuration.get(self.SECTION_GENERAL, self.KEYWORD_ITEM_FILE, fallback=None)
                 )
-            except FileNotFoundError:
-                raise ValueError('Neither was given a list with the key "{items_keyword}", nor was a file provided'
-                                 'with the key "{item_file_keyword}" containing a proper list! '
-                                 'I cannot work like this!!!'. format(
-                                  items_keyword=self.KEYWORD_ITEMS, item_file_keyword=self.KEYWORD_ITEM_FILE)
-                                 )
-
-        self.items = set(self._convert_string_to_list(item_list_string))
-        self.languages = self._convert_string_to_list(self._configuration[self.SECTION_GENERAL][self.KEYWORD_LANGUAGES])
-
-    def _read_items_from_external_file(self, external_file_path: str) -> set:
-        with open(external_file_path, 'r') as external_file:
-            list_of_items_string = external_file.read()
-
-            item_set = set(self._convert_string_to_list(list_of_items_string))
+            self._set_item_file(item_file_path)
 
-            if not item_set:
-                raise ValueError('The given file does not contain a proper list of items!')
-
-            return item_set
+        self.languages = self._convert_string_to_list(self._configuration[self.SECTION_GENERAL][self.KEYWORD_LANGUAGES])
+        self.log_level = self._configuration.get(self.SECTION_GENERAL, self.KEYWORD_LOG_LEVEL, fallback=None)
+
+    def _set_item_file(self, item_file_path):
+        if item_file_path is None or (str(item_file_path) != ItemSource.STDIN_PATH
+                                      and not os.path.isfile(str(item_file_path))):
+            raise ValueError('Neither was given a list with the key "{items_keyword}", nor was a file provided '
+                             'with the key "{item_file_keyword}" containing a proper list! '
+                             'I cannot work like this!!!'.format(
+                              items_keyword=self.KEYWORD_ITEMS, item_file_keyword=self.KEYWORD_ITEM_FILE)
+                             )
+
+        self.items = ItemSource.from_file(item_file_path)
 
     def _convert_string_to_list(self, list_string: str) -> list:
         return list(json.loads(list_string))
@@ -0,0 +1,99 @@
+import json
+import sys
+
+
+class ItemSource:
+    """Streams the IDs of the items to process, in the order they are given and without duplicates.
+
+    The items are read line by line, so an export can start before a long list is read completely.
+    Every line may contain a single ID, comma separated IDs or a part of a JSON list, so the lists of the
+    configuration file and of item files written for it are read as before. Lines holding a JSON value
+    of their own (JSON lines) give an ID as string, number or object with the key "id".
+    Empty lines and lines starting with a hash are skipped.
+
+    A source can be iterated several times, except if it reads from the standard input.
+    """
+
+    ID_KEY = "id"
+    COMMENT_PREFIX = "#"
+    STDIN_PATH = "-"
+
+    def __init__(self, open_lines, name: str):
+        """
+        :param open_lines: A callable returning a new iterable of the lines of the source on every call.
+        :param name: The name of the source used in error messages, e.g. the file path.
+        :type name: str
+        """
+
+        self._open_lines = open_lines
+        self.name = name
+
+    @classmethod
+    def from_string(cls, item_list_string: str, name: str = "items"):
+        return cls(lambda: iter(item_list_string.splitlines()), name)
+
+    @classmethod
+    def from_file(cls, item_file_path):
+        """
+        :param item_file_path: The path of the item file. With "-", the items are read from the standard input.
+        :type item_file_path: Path or str
+        """
+
+        item_file_path = str(item_file_path)
+        if item_file_path == cls.STDIN_PATH:
+            return cls(lambda: sys.stdin, "the standard input")
+
+        def open_lines():
+            with open(item_file_path, "r") as item_file:
+                yield from item_file
+
+        return cls(open_lines, item_file_path)
+
+    def __iter__(self):
+        """Yields every item ID once, at its first occurrence.
+        :except: If the source does not contain any item, a ValueError is thrown.
+        """
+
+        seen_item_ids = set()
+        for line in self._open_lines():
+            for item_id in self._parse_line(line):
+                if item_id not in seen_item_ids:
+                    seen_item_ids.add(item_id)
+                    yield item_id
+
+        if not seen_item_ids:
+            raise ValueError(
+                "{name} does not contain a proper list of items!".format(name=self.name)
+            )
+
+    def _parse_line(self, line: str) -> list:
+        line = line.strip()
+        if not line or line.startswith(self.COMMENT_PREFIX):
+            return []
+
+        try:
+            value = json.loads(line)
+        except ValueError:
+            # A line of a list spanning several lines, e.g. '"10812612",' or 'item1, item2'
+            return [
+                item_id
+                for item_id in map(self._parse_item_id, line.strip("[]").split(","))
+                if item_id
+            ]
+
+        if isinstance(value, list):
+            return [self._convert_value_to_item_id(element) for element in value]
+        else:
+            return [self._convert_value_to_item_id(value)]
+
+    def _convert_value_to_item_id(self, value) -> str:
+        if isinstance(value, dict):
+            value = value[self.ID_KEY]
+        return str(value)
+
+    @staticmethod
+    def _parse_item_id(item_string: str) -> str:
+        item_string = item_string.strip()
+        if item_string.startswith('"'):
+            return json.loads(item_string)
+        return item_string
@@ -1,4 +1,8 @@
+import queue
+
 from VisualLibrary import VisualLibrary
+from ojs.journal import JournalExporter
+from ojs.logs import start_logging, stop_logging
 from ojs.xmlgenerator import OjsXmlGenerator, Journal
 from configuration.Configurator import Configurator
 
@@ -7,6 +11,14 @@ def main():
     configurator = Configurator()
     configurator.parse_configuration()
 
+    queue_listener = start_logging(queue.SimpleQueue(), configurator.log_level or 'INFO')
+    try:
+        export_items(configurator)
+    finally:
+        stop_logging(queue_listener)
+
+
+def export_items(configurator):
     ojs_xml_generator = OjsXmlGenerator(configurator)
 
     vl = VisualLibrary()
@@ -14,11 +26,11 @@ def main():
     for item_id in items_to_process:
         vl_obj = vl.get_element_for_id(item_id)
         if isinstance(vl_obj, Journal):
-            for volume in vl_obj.volumes:
-                generate_xml(volume, ojs_xml_generator)
-            for article in vl_obj.articles:
-                article.is_standalone = True
-                generate_xml(article, ojs_xml_generator)
+            journal_exporter = JournalExporter(ojs_xml_generator)
+            for journal_document in journal_exporter.generate_xml_documents(vl_obj):
+                print('Store {name} to file!'.format(name=journal_document.name))
+                output_file_path = './xml/{name}.xml'.format(name=journal_document.name)
+                save_xml_to_file_path(journal_document.xml_string, output_file_path)
         else:
             generate_xml(vl_obj, ojs_xml_generator)
 
@@ -0,0 +1,198 @@
+import hashlib
+import logging
+import os
+import pathlib
+import pickle
+import tempfile
+import time
+
+from templates.template_functions import BASE64_CHUNK_SIZE, iterate_file_data
+
+logger = logging.getLogger("XmlGenerator.Cache")
+
+
+class DiskCache:
+    """A content-addressed cache on disk with a size-bounded LRU eviction and an optional time to live.
+
+    Every entry is stored in a file named by the SHA-256 hash of its key. The modification time of a file
+    is its creation time (for the time to live), the access time is updated on every read (for the LRU eviction).
+    """
+
+    TEMPORARY_FILE_PREFIX = ".tmp-"
+
+    def __init__(
+        self, cache_directory, max_size: int = None, time_to_live: float = None
+    ):
+        """
+        :param cache_directory: The directory to store the cached data in.
+        :type cache_directory: str or Path
+        :param max_size: The maximal size of the cache in bytes. If None, the cache is unbounded.
+        :type max_size: int
+        :param time_to_live: The number of seconds an entry is valid. If None, entries never expire.
+        :type time_to_live: float
+        """
+
+        self.cache_directory = pathlib.Path(cache_directory)
+        self.max_size = max_size
+        self.time_to_live = time_to_live
+
+        self.cache_directory.mkdir(parents=True, exist_ok=True)
+
+    def get_path(self, key: str):
+        """Returns the path of the cached data for the given key, or None if there is no valid entry."""
+
+        entry_path = self._get_entry_path(key)
+        try:
+            entry_stat = entry_path.stat()
+        except FileNotFoundError:
+            return None
+
+        now = time.time()
+        if (
+            self.time_to_live is not None
+            and now - entry_stat.st_mtime > self.time_to_live
+        ):
+            self._remove_entry(entry_path)
+            return None
+
+        os.utime(str(entry_path), (now, entry_stat.st_mtime))
+        return entry_path
+
+    def get(self, key: str):
+        """Returns the cached bytes for the given key, or None if there is no valid entry."""
+
+        entry_path = self.get_path(key)
+        if entry_path is None:
+            return None
+
+        try:
+            return entry_path.read_bytes()
+        except FileNotFoundError:
+            # Evicted by another process in the meantime
+            return None
+
+    def put(self, key: str, data: bytes) -> pathlib.Path:
+        return self.put_chunks(key, [data])
+
+    def put_chunks(self, key: str, data_chunks) -> pathlib.Path:
+        """Stores the given chunks of bytes under the given key.
+        The data is written to a temporary file first, so that no incomplete entries can be read.
+        """
+
+        entry_path = self._get_entry_path(key)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            prefix=self.TEMPORARY_FILE_PREFIX, dir=str(entry_path.parent)
+        )
+        try:
+            with os.fdopen(file_descriptor, "wb") as temporary_file:
+                for data_chunk in data_chunks:
+                    temporary_file.write(data_chunk)
+            os.replace(temporary_path, str(entry_path))
+        except BaseException:
+            self._remove_entry(pathlib.Path(temporary_path))
+            raise
+
+        self.evict(keep_path=entry_path)
+        return entry_path
+
+    def evict(self, keep_path: pathlib.Path = None):
+        """Removes the least recently used entries until the cache fits into its maximal size.
+        :param keep_path: An entry that must not be removed, e.g. because it was just written.
+        :type keep_path: Path
+        """
+
+        if self.max_size is None:
+            return
+
+        entries = []
+        for entry_path in self.cache_directory.glob("*/*"):
+            if entry_path.name.startswith(self.TEMPORARY_FILE_PREFIX):
+                continue
+
+            try:
+                entries.append((entry_path.stat(), entry_path))
+            except FileNotFoundError:
+                continue
+
+        cache_size = sum(entry_stat.st_size for entry_stat, _ in entries)
+        for entry_stat, entry_path in sorted(
+            entries, key=lambda entry: entry[0].st_atime
+        ):
+            if cache_size <= self.max_size:
+                break
+            if entry_path == keep_path:
+                continue
+
+            logger.debug("Evicting %s from cache", entry_path)
+            self._remove_entry(entry_path)
+            cache_size -= entry_stat.st_size
+
+    def iterate_data(self, file, chunk_size: int = BASE64_CHUNK_SIZE):
+        """Yields the binary content of a file chunk by chunk, the same way `iterate_file_data` does.
+        Files that have to be downloaded from their URL are stored in the cache and read from the disk afterwards.
+
+        With this method, the cache can be used as `file_data_source` in the templates.
+        """
+
+        url = getattr(file, "url", None)
+        is_download = (
+            url is not None
+            and getattr(file, "local_path", None) is None
+            and getattr(file, "data", None) is None
+        )
+        if not is_download:
+            yield from iterate_file_data(file, chunk_size)
+            return
+
+        cache_key = "file:{url}".format(url=url)
+        entry_path = self.get_path(cache_key)
+        if entry_path is None:
+            logger.debug("Downloading %s into cache", url)
+            entry_path = self.put_chunks(cache_key, iterate_file_data(file, chunk_size))
+
+        with open(str(entry_path), "rb") as cached_file:
+            yield from iter(lambda: cached_file.read(chunk_size), b"")
+
+    def _get_entry_path(self, key: str) -> pathlib.Path:
+        key_hash = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.cache_directory / key_hash[:2] / key_hash
+
+    def _remove_entry(self, entry_path: pathlib.Path):
+        try:
+            entry_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class CachingVisualLibrary:
+    """Wraps a VisualLibrary object and caches the elements it returns in a DiskCache."""
+
+    def __init__(self, visual_library, disk_cache: DiskCache):
+        self.visual_library = visual_library
+        self.disk_cache = disk_cache
+
+    def get_element_for_id(self, element_id: str):
+        cache_key = "element:{id}".format(id=element_id)
+
+        cached_element = self.disk_cache.get(cache_key)
+        if cached_element is not None:
+            try:
+                return pickle.loads(cached_element)
+            except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+                logger.warning(
+                    "Cached element %s is corrupted, downloading it again", element_id
+                )
+
+        element = self.visual_library.get_element_for_id(element_id)
+
+        try:
+            self.disk_cache.put(cache_key, pickle.dumps(element))
+        except (pickle.PicklingError, RecursionError, TypeError, AttributeError):
+            logger.warning("Element %s cannot be cached", element_id)
+
+        return element
+
+    def __getattr__(self, attribute_name):
+        return getattr(self.visual_library, attribute_name)
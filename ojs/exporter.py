@@ -0,0 +1,756 @@
+import argparse
+import gzip
+import importlib.util
+import json
+import logging
+import lzma
+import multiprocessing
+import pathlib
+import queue
+import sys
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING
+
+from configuration.Configurator import Configurator
+from ojs.filestore import ExternalFileDirectory
+from ojs.instrumentation import (
+    NO_INSTRUMENTATION,
+    STAGE_FETCH,
+    STAGE_VALIDATE,
+    STAGE_WRITE,
+    Instrumentation,
+    JsonLinesSink,
+)
+from ojs.journal import JournalExporter
+from ojs.logs import (
+    DEFAULT_LOG_LEVEL,
+    LOG_LEVELS,
+    LOGGER_NAME,
+    attach_to_log_queue,
+    start_logging,
+    stop_logging,
+)
+from ojs.prefetch import (
+    DEFAULT_MAX_IN_FLIGHT_BYTES,
+    FilePrefetcher,
+    iterate_files_in_render_order,
+)
+from templates.template_functions import (
+    FILE_DATA_SOURCE_VARIABLE_NAME,
+    FILE_EMBEDDING_EXTERNAL_DIRECTORY,
+    FILE_STORE_VARIABLE_NAME,
+)
+
+# The Visual Library, the XML generation and the validation take long to import. They are imported on
+# first use, so that `--help`, wrong arguments and broken configurations are reported at once.
+if TYPE_CHECKING:
+    from ojs.cache import DiskCache
+    from ojs.manifest import ExportManifest
+    from ojs.xmlgenerator import OjsXmlGenerator, XmlGenerator
+
+logger = logging.getLogger("XmlGenerator.Exporter")
+
+COMPRESSION_GZIP = "gzip"
+COMPRESSION_XZ = "xz"
+COMPRESSION_ZSTD = "zstd"
+COMPRESSION_FILE_SUFFIXES = {
+    COMPRESSION_GZIP: ".gz",
+    COMPRESSION_XZ: ".xz",
+    COMPRESSION_ZSTD: ".zst",
+}
+# The default level 9 of gzip is much slower, but hardly compresses the base64 encoded files any better
+GZIP_COMPRESSION_LEVEL = 6
+DEFAULT_CONFIGURATION_FILE_PATH = "config.ini"
+# The directory in the output directory the files are stored in with `file_embedding = external-dir`
+DEFAULT_FILE_DIRECTORY_NAME = "files"
+DEFAULT_OUTPUT_DIRECTORY = "xml"
+EXECUTOR_PROCESS = "process"
+EXECUTOR_THREAD = "thread"
+EXECUTORS = {EXECUTOR_PROCESS: ProcessPoolExecutor, EXECUTOR_THREAD: ThreadPoolExecutor}
+MEGABYTE = 1024 * 1024
+# The number of items scheduled per worker before the result of the first one is awaited
+PENDING_ITEMS_PER_JOB = 2
+SUMMARY_FILE_NAME = "summary.json"
+
+# Identifies an item in the measurements before its element is downloaded
+VisualLibraryItem = namedtuple("VisualLibraryItem", ["id"])
+ExportResult = namedtuple(
+    "ExportResult",
+    ["item_id", "output_files", "error", "duration", "content_hash", "skipped"],
+)
+ExportSettings = namedtuple(
+    "ExportSettings",
+    [
+        "template_configuration",
+        "output_directory",
+        "cache_directory",
+        "cache_max_size",
+        "cache_time_to_live",
+        "max_document_size",
+        "metrics_file_path",
+        "trace_memory",
+        "prefetch_workers",
+        "prefetch_max_bytes",
+        "compression",
+        "validate",
+    ],
+)
+ExportSettings.__new__.__defaults__ = (
+    None,
+    None,
+    None,
+    None,
+    None,
+    False,
+    None,
+    None,
+    None,
+    False,
+)
+
+
+@lru_cache(maxsize=None)
+def get_instrumentation(
+    metrics_file_path: str = None, trace_memory: bool = False
+) -> Instrumentation:
+    """Returns the Instrumentation writing to the given JSON-lines file. It is created only once per process.
+    Without a file, nothing is measured.
+    """
+
+    if metrics_file_path is None:
+        return NO_INSTRUMENTATION
+
+    return Instrumentation(
+        [JsonLinesSink(metrics_file_path)], trace_memory=trace_memory
+    )
+
+
+def get_ojs_xml_generator(
+    template_configuration: dict, instrumentation: Instrumentation = None
+) -> "OjsXmlGenerator":
+    """Returns the OjsXmlGenerator for the given template configuration. It is created only once per process.
+    The workers get the template configuration parsed by the main process, they never read the
+    configuration file or the items themselves.
+    """
+
+    return _get_ojs_xml_generator_for_json(
+        json.dumps(template_configuration, sort_keys=True), instrumentation
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_ojs_xml_generator_for_json(
+    template_configuration_json: str, instrumentation: Instrumentation = None
+) -> "OjsXmlGenerator":
+    from ojs.xmlgenerator import OjsXmlGenerator
+
+    configurator = Configurator.from_template_configuration(
+        json.loads(template_configuration_json)
+    )
+    return OjsXmlGenerator(configurator, instrumentation)
+
+
+@lru_cache(maxsize=None)
+def get_disk_cache(
+    cache_directory: str, max_size: int = None, time_to_live: float = None
+) -> "DiskCache":
+    """Returns the DiskCache for the given directory. It is created only once per process."""
+
+    from ojs.cache import DiskCache
+
+    return DiskCache(cache_directory, max_size=max_size, time_to_live=time_to_live)
+
+
+def iterate_exportable_objects(vl_object):
+    """Yields the objects of a Visual Library element that have to be exported in a file of their own.
+    A journal is resolved lazily into its issues and its standalone articles (see `JournalExporter`),
+    every other element is returned itself.
+    """
+
+    from VisualLibrary import Journal
+
+    if isinstance(vl_object, Journal):
+        yield from JournalExporter.iterate_exportable_elements(vl_object)
+    else:
+        yield vl_object
+
+
+def get_output_file_name(document_name: str, compression: str = None) -> str:
+    """Returns the name of the XML file of a document, e.g. "<document_name>.xml.gz" for gzip."""
+
+    return "{name}.xml{suffix}".format(
+        name=document_name, suffix=COMPRESSION_FILE_SUFFIXES.get(compression, "")
+    )
+
+
+def get_file_opener(compression: str = None):
+    """Returns the function opening files of the given compression like `open`, e.g. `gzip.open` for gzip.
+    :param compression: One of `COMPRESSION_FILE_SUFFIXES`. If None, the builtin `open` is returned.
+    :type compression: str
+    """
+
+    if compression is None:
+        return open
+    elif compression == COMPRESSION_GZIP:
+        return partial(gzip.open, compresslevel=GZIP_COMPRESSION_LEVEL)
+    elif compression == COMPRESSION_XZ:
+        return lzma.open
+    elif compression == COMPRESSION_ZSTD:
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError(
+                'The compression "{compression}" needs the package "zstandard"! Install it with pip.'.format(
+                    compression=compression
+                )
+            )
+
+        return zstandard.open
+    else:
+        raise ValueError(
+            'Unknown compression "{compression}"! Choose one of: {compressions}'.format(
+                compression=compression,
+                compressions=", ".join(sorted(COMPRESSION_FILE_SUFFIXES)),
+            )
+        )
+
+
+def open_output_file(file_path, compression: str = None):
+    """Opens a text file to write XML into.
+    :param file_path: The path of the file.
+    :type file_path: str or Path
+    :param compression: One of `COMPRESSION_FILE_SUFFIXES`. If None, the file is not compressed.
+    :type compression: str
+    :returns: A text file-like object. The written text is compressed chunk by chunk, while it is written.
+    :rtype: io.TextIOBase
+    """
+
+    return get_file_opener(compression)(str(file_path), "wt", encoding="utf-8")
+
+
+def open_input_file(file_path, compression: str = None):
+    """Opens a written XML file for reading. The file is decompressed chunk by chunk, while it is read.
+    :returns: A binary file-like object.
+    :rtype: io.BufferedIOBase
+    """
+
+    return get_file_opener(compression)(str(file_path), "rb")
+
+
+def save_xml_documents_to_directory(
+    ojs_object: "XmlGenerator",
+    output_directory: str,
+    document_name: str,
+    max_document_size: int,
+    compression: str = None,
+) -> list:
+    """Writes the XML of the given OJS object split into documents of a maximal size.
+    The documents are named "<document_name>-<number>.xml". The maximal size applies to the uncompressed documents.
+    :returns: The paths of the written documents.
+    :rtype: list
+    """
+
+    output_file_paths = []
+    for document_number, xml_document in enumerate(
+        ojs_object.generate_xml_documents(max_document_size), start=1
+    ):
+        output_file_path = pathlib.Path(output_directory) / get_output_file_name(
+            "{name}-{number}".format(name=document_name, number=document_number),
+            compression,
+        )
+        with ojs_object.instrumentation.measure(STAGE_WRITE, ojs_object) as stage:
+            with open_output_file(output_file_path, compression) as output_file:
+                output_file.write(xml_document)
+            stage.add_output(xml_document)
+        output_file_paths.append(str(output_file_path))
+
+    return output_file_paths
+
+
+def save_xml_to_file_path(
+    ojs_object: "XmlGenerator", file_path: pathlib.Path, compression: str = None
+):
+    """Writes the XML of the given OJS object to the given path, compressed if a compression is given.
+    If no pretty printing is configured, the XML is streamed into the file.
+    """
+
+    if ojs_object.pretty_printer == ojs_object.PRETTY_PRINTER_NONE:
+        with open_output_file(file_path, compression) as output_file:
+            ojs_object.generate_xml_to(output_file)
+        return
+
+    xml_string = ojs_object.generate_xml()
+    with ojs_object.instrumentation.measure(STAGE_WRITE, ojs_object) as stage:
+        with open_output_file(file_path, compression) as output_file:
+            output_file.write(xml_string)
+        stage.add_output(xml_string)
+
+
+def validate_output_files(
+    ojs_object: "XmlGenerator", output_file_paths: list, compression: str = None
+):
+    """Validates the written XML files of the given OJS object against the OJS native XML schema.
+    The files are read back chunk by chunk, hence they are never held in memory as a whole.
+    :except: A ValueError is raised for the first file violating the schema.
+    """
+
+    from lxml import etree
+
+    from ojs.validation import validate_xml_file
+
+    for output_file_path in output_file_paths:
+        with ojs_object.instrumentation.measure(STAGE_VALIDATE, ojs_object):
+            try:
+                with open_input_file(output_file_path, compression) as xml_file:
+                    validate_xml_file(xml_file, ojs_object.use_pre_3_2_schema)
+            except etree.XMLSyntaxError as error:
+                raise ValueError(
+                    "{path} does not conform to the OJS native XML schema: {error}".format(
+                        path=output_file_path, error=error
+                    )
+                ) from error
+
+
+def get_default_file_store(
+    ojs_xml_generator: "OjsXmlGenerator", settings: ExportSettings
+):
+    """Returns the store for the files, if they are stored in an external directory without a configured one.
+    The files are then stored in a directory inside the output directory.
+    """
+
+    template_configuration = ojs_xml_generator.template_configuration
+    if (
+        template_configuration.get(Configurator.KEYWORD_FILE_EMBEDDING)
+        != FILE_EMBEDDING_EXTERNAL_DIRECTORY
+        or template_configuration.get(Configurator.KEYWORD_FILE_DIRECTORY) is not None
+    ):
+        return None
+
+    return ExternalFileDirectory(
+        pathlib.Path(settings.output_directory) / DEFAULT_FILE_DIRECTORY_NAME,
+        template_configuration.get(Configurator.KEYWORD_FILE_BASE_URL),
+    )
+
+
+def save_ojs_object(
+    ojs_object: "XmlGenerator", document_name: str, settings: ExportSettings
+) -> list:
+    """Writes the XML of the given OJS object into the output directory, split into documents if configured.
+    :returns: The paths of the written files.
+    :rtype: list
+    """
+
+    if settings.max_document_size is not None:
+        return save_xml_documents_to_directory(
+            ojs_object,
+            settings.output_directory,
+            document_name,
+            settings.max_document_size,
+            settings.compression,
+        )
+
+    output_file_path = pathlib.Path(settings.output_directory) / get_output_file_name(
+        document_name, settings.compression
+    )
+    save_xml_to_file_path(ojs_object, output_file_path, settings.compression)
+
+    return [str(output_file_path)]
+
+
+def export_item(
+    item_id: str, settings: ExportSettings, previous_content_hash: str = None
+) -> ExportResult:
+    """Downloads a Visual Library item and stores its OJS XML in the output directory.
+    :param item_id: The Visual Library ID of the item.
+    :type item_id: str
+    :param settings: The template configuration, the output directory and the cache to use.
+    :type settings: ExportSettings
+    :param previous_content_hash: The content hash of the last export of this item. If the item did not change
+    since then, no XML is generated.
+    :type previous_content_hash: str
+    :returns: The result of the export. Any exception is caught and stored as error in the result.
+    :rtype: ExportResult
+
+    The file IDs are allocated per rendered document. Hence, the result does not depend on
+    which items were processed before in the same worker.
+    """
+
+    from VisualLibrary import VisualLibrary
+
+    from ojs.cache import CachingVisualLibrary
+    from ojs.manifest import compute_content_hash
+
+    start_time = time.perf_counter()
+    output_files = []
+    content_hash = None
+
+    try:
+        instrumentation = get_instrumentation(
+            settings.metrics_file_path, settings.trace_memory
+        )
+        ojs_xml_generator = get_ojs_xml_generator(
+            settings.template_configuration, instrumentation
+        )
+
+        visual_library = VisualLibrary()
+        disk_cache = None
+        if settings.cache_directory is not None:
+            disk_cache = get_disk_cache(
+                settings.cache_directory,
+                settings.cache_max_size,
+                settings.cache_time_to_live,
+            )
+            visual_library = CachingVisualLibrary(visual_library, disk_cache)
+
+        with instrumentation.measure(STAGE_FETCH, VisualLibraryItem(item_id)):
+            vl_object = visual_library.get_element_for_id(item_id)
+
+        # The document size and the compression change the output files,
+        # hence they are part of the hashed configuration
+        content_hash = compute_content_hash(
+            vl_object,
+            dict(
+                ojs_xml_generator.template_configuration,
+                max_document_size=settings.max_document_size,
+                compression=settings.compression,
+            ),
+        )
+        if content_hash == previous_content_hash:
+            logger.info("Item %s is unchanged, skipping it.", item_id)
+            return ExportResult(
+                item_id, [], None, time.perf_counter() - start_time, content_hash, True
+            )
+
+        for exportable_object in iterate_exportable_objects(vl_object):
+            logger.info(
+                "Generating XML for %s %s",
+                exportable_object.__class__.__name__,
+                exportable_object.id,
+            )
+            ojs_object = ojs_xml_generator.convert_vl_objecto_to_ojs_object(
+                exportable_object
+            )
+            file_data_source = disk_cache
+            if settings.prefetch_workers:
+                file_data_source = FilePrefetcher(
+                    iterate_files_in_render_order(ojs_object),
+                    max_workers=settings.prefetch_workers,
+                    max_in_flight_bytes=settings.prefetch_max_bytes
+                    or DEFAULT_MAX_IN_FLIGHT_BYTES,
+                    file_data_source=disk_cache,
+                )
+            if file_data_source is not None:
+                ojs_object.add_variable_to_template_configuration(
+                    FILE_DATA_SOURCE_VARIABLE_NAME, file_data_source
+                )
+            file_store = get_default_file_store(ojs_xml_generator, settings)
+            if file_store is not None:
+                ojs_object.add_variable_to_template_configuration(
+                    FILE_STORE_VARIABLE_NAME, file_store
+                )
+
+            try:
+                saved_files = save_ojs_object(
+                    ojs_object, exportable_object.id, settings
+                )
+                output_files.extend(saved_files)
+                if settings.validate:
+                    validate_output_files(ojs_object, saved_files, settings.compression)
+            finally:
+                if isinstance(file_data_source, FilePrefetcher):
+                    file_data_source.close()
+    except Exception as error:
+        logger.exception("Export of item %s failed!", item_id)
+        return ExportResult(
+            item_id,
+            output_files,
+            repr(error),
+            time.perf_counter() - start_time,
+            content_hash,
+            False,
+        )
+
+    return ExportResult(
+        item_id,
+        output_files,
+        None,
+        time.perf_counter() - start_time,
+        content_hash,
+        False,
+    )
+
+
+def export_items(
+    item_ids,
+    settings: ExportSettings,
+    jobs: int = 1,
+    executor: str = EXECUTOR_PROCESS,
+    manifest: "ExportManifest" = None,
+    log_queue=None,
+):
+    """Exports all given items with a pool of workers.
+    :param item_ids: An iterable of item IDs, e.g. an ItemSource. It is consumed as the export proceeds.
+    :param manifest: If given, only items that changed since their last export are generated.
+    :type manifest: ExportManifest
+    :param log_queue: If given, worker processes send their log records to this `multiprocessing.Queue`.
+    :returns: A generator of ExportResults in the order of the given item IDs, regardless of the scheduling.
+    :rtype: Generator[ExportResult]
+
+    Only a few items per worker are scheduled ahead of the results, so the export of a long list of items
+    starts at once and neither the IDs nor the pending results of all items are held in memory.
+    """
+
+    def get_arguments(item_id):
+        previous_content_hash = (
+            manifest.get_content_hash(item_id) if manifest is not None else None
+        )
+        return item_id, settings, previous_content_hash
+
+    if jobs <= 1:
+        for item_id in item_ids:
+            yield export_item(*get_arguments(item_id))
+        return
+
+    executor_arguments = {}
+    if executor == EXECUTOR_PROCESS and log_queue is not None:
+        executor_arguments = dict(
+            initializer=attach_to_log_queue,
+            initargs=(log_queue, logging.getLogger(LOGGER_NAME).getEffectiveLevel()),
+        )
+
+    with EXECUTORS[executor](max_workers=jobs, **executor_arguments) as worker_pool:
+        pending_results = deque()
+        for item_id in item_ids:
+            pending_results.append(
+                worker_pool.submit(export_item, *get_arguments(item_id))
+            )
+            if len(pending_results) >= jobs * PENDING_ITEMS_PER_JOB:
+                yield pending_results.popleft().result()
+
+        while pending_results:
+            yield pending_results.popleft().result()
+
+
+def write_summary(results: list, output_directory: str, duration: float) -> dict:
+    """Writes the per-item results and the totals of an export run to a JSON file in the output directory."""
+
+    failed_results = [result for result in results if result.error is not None]
+    skipped_results = [result for result in results if result.skipped]
+    summary = {
+        "items": [result._asdict() for result in results],
+        "succeeded": len(results) - len(failed_results) - len(skipped_results),
+        "skipped": len(skipped_results),
+        "failed": len(failed_results),
+        "duration": duration,
+    }
+
+    summary_file_path = pathlib.Path(output_directory) / SUMMARY_FILE_NAME
+    with open(str(summary_file_path), "w") as summary_file:
+        json.dump(summary, summary_file, indent=2)
+
+    return summary
+
+
+def parse_arguments(arguments=None):
+    argument_parser = argparse.ArgumentParser(
+        description="Exports Visual Library items to OJS native XML files."
+    )
+    argument_parser.add_argument(
+        "-c",
+        "--config",
+        default=DEFAULT_CONFIGURATION_FILE_PATH,
+        help="The path to the INI-configuration file (default: %(default)s).",
+    )
+    argument_parser.add_argument(
+        "-i",
+        "--items",
+        help="A file listing the IDs of the items to export, one per line, comma separated or as JSON lines. "
+        'With "-", the IDs are read from the standard input. Overrides the items of the configuration file.',
+    )
+    argument_parser.add_argument(
+        "-o",
+        "--output-directory",
+        default=DEFAULT_OUTPUT_DIRECTORY,
+        help="The directory to store the XML files in (default: %(default)s).",
+    )
+    argument_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="The number of items processed in parallel (default: %(default)s).",
+    )
+    argument_parser.add_argument(
+        "--executor",
+        choices=sorted(EXECUTORS),
+        default=EXECUTOR_PROCESS,
+        help="Whether the items are processed in processes or threads (default: %(default)s).",
+    )
+    argument_parser.add_argument(
+        "--log-level",
+        type=str.upper,
+        choices=LOG_LEVELS,
+        help="The minimal level of the logged messages. Overrides the log level of the configuration file "
+        "(default: {default}).".format(default=DEFAULT_LOG_LEVEL),
+    )
+    argument_parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help="Export all items, even if they did not change since their last export.",
+    )
+    argument_parser.add_argument(
+        "--cache-directory",
+        help="A directory to cache the Visual Library metadata and files in. Without it, nothing is cached.",
+    )
+    argument_parser.add_argument(
+        "--cache-max-size",
+        type=int,
+        help="The maximal size of the cache in megabytes. The least recently used entries are removed first.",
+    )
+    argument_parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        help="The number of seconds a cache entry is valid. Without it, entries never expire.",
+    )
+    argument_parser.add_argument(
+        "--metrics-file",
+        help="A JSON-lines file to append the duration and output size of every stage of every item to.",
+    )
+    argument_parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Add the memory peak of every stage to the metrics file. This slows down the export. "
+        "Ignored with more than one thread, as the threads share the traced memory.",
+    )
+    argument_parser.add_argument(
+        "--prefetch-workers",
+        type=int,
+        help="Download the files of an item in this many background threads while its XML is rendered.",
+    )
+    argument_parser.add_argument(
+        "--prefetch-max-size",
+        type=int,
+        help="The maximal size of the prefetched but not yet rendered files in megabytes (default: {default}).".format(
+            default=DEFAULT_MAX_IN_FLIGHT_BYTES // MEGABYTE
+        ),
+    )
+    argument_parser.add_argument(
+        "--max-document-size",
+        type=int,
+        help="Split the XML of every item into documents of at most this many megabytes.",
+    )
+    argument_parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="Validate every written XML file against the OJS native XML schema. Invalid items fail.",
+    )
+    argument_parser.add_argument(
+        "--compress",
+        choices=sorted(COMPRESSION_FILE_SUFFIXES),
+        help="Compress the XML files while they are written. zstd needs the package zstandard.",
+    )
+
+    arguments = argument_parser.parse_args(arguments)
+    if (
+        arguments.compress == COMPRESSION_ZSTD
+        and importlib.util.find_spec("zstandard") is None
+    ):
+        argument_parser.error(
+            'The compression "zstd" needs the package "zstandard"! Install it with pip.'
+        )
+
+    return arguments
+
+
+def main(arguments=None):
+    arguments = parse_arguments(arguments)
+
+    configurator = Configurator()
+    configurator.parse_configuration(arguments.config, arguments.items)
+
+    log_level = arguments.log_level or configurator.log_level or DEFAULT_LOG_LEVEL
+    # Worker processes cannot reach a queue of the main process, only a multiprocessing queue
+    if arguments.executor == EXECUTOR_PROCESS and arguments.jobs > 1:
+        log_queue = multiprocessing.Queue()
+    else:
+        log_queue = queue.SimpleQueue()
+    queue_listener = start_logging(log_queue, log_level)
+    try:
+        return run_export(configurator, arguments, log_queue)
+    finally:
+        stop_logging(queue_listener)
+
+
+def run_export(configurator: Configurator, arguments, log_queue=None) -> int:
+    """Exports the configured items as given by the parsed command-line arguments.
+    :returns: The exit code: 1, if any item failed, otherwise 0.
+    :rtype: int
+    """
+
+    from ojs.manifest import ExportManifest
+
+    trace_memory = arguments.trace_memory
+    # tracemalloc traces the whole process, the peaks of items exported in parallel threads would mix
+    if trace_memory and arguments.executor == EXECUTOR_THREAD and arguments.jobs > 1:
+        logger.warning(
+            "The memory peaks are not traced with more than one thread. "
+            "Use --executor process or --jobs 1 with --trace-memory."
+        )
+        trace_memory = False
+
+    pathlib.Path(arguments.output_directory).mkdir(parents=True, exist_ok=True)
+    manifest = ExportManifest(arguments.output_directory)
+    settings = ExportSettings(
+        configurator.get_template_configuration(),
+        arguments.output_directory,
+        cache_directory=arguments.cache_directory,
+        cache_max_size=arguments.cache_max_size * MEGABYTE
+        if arguments.cache_max_size is not None
+        else None,
+        cache_time_to_live=arguments.cache_ttl,
+        max_document_size=arguments.max_document_size * MEGABYTE
+        if arguments.max_document_size is not None
+        else None,
+        metrics_file_path=arguments.metrics_file,
+        trace_memory=trace_memory,
+        prefetch_workers=arguments.prefetch_workers,
+        prefetch_max_bytes=arguments.prefetch_max_size * MEGABYTE
+        if arguments.prefetch_max_size is not None
+        else None,
+        compression=arguments.compress,
+        validate=arguments.validate,
+    )
+
+    start_time = time.perf_counter()
+    results = []
+    for result in export_items(
+        configurator.items,
+        settings,
+        jobs=arguments.jobs,
+        executor=arguments.executor,
+        manifest=None if arguments.force else manifest,
+        log_queue=log_queue,
+    ):
+        if result.error is None and not result.skipped:
+            manifest.record(result.item_id, result.content_hash, result.output_files)
+        results.append(result)
+    summary = write_summary(
+        results, arguments.output_directory, time.perf_counter() - start_time
+    )
+
+    logger.info(
+        "Exported %d items, skipped %d unchanged items, %d failed.",
+        summary["succeeded"],
+        summary["skipped"],
+        summary["failed"],
+    )
+
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
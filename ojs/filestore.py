@@ -0,0 +1,133 @@
+import logging
+import os
+import pathlib
+import shutil
+import tempfile
+
+from templates.template_functions import (
+    BASE64_CHUNK_SIZE,
+    get_file_suffix,
+    get_name_for_mime_type,
+    iterate_file_data,
+)
+
+logger = logging.getLogger("XmlGenerator.FileStore")
+
+DEFAULT_FILE_SUFFIX = "bin"
+
+
+class ExternalFileDirectory:
+    """Stores the submission files in a directory instead of embedding them into the XML (`file_embedding = external-dir`).
+
+    The XML references every stored file by its absolute path or, if a base URL is given, by the URL the
+    directory is served at. Files with a local path are hard-linked into the directory where possible,
+    all other files are streamed into it chunk by chunk.
+    """
+
+    TEMPORARY_FILE_PREFIX = ".tmp-"
+
+    def __init__(self, directory, base_url: str = None):
+        """
+        :param directory: The directory to store the files in.
+        :type directory: str or Path
+        :param base_url: The URL the directory is served at. If None, the files are referenced by their path.
+        :type base_url: str
+        """
+
+        self.directory = pathlib.Path(directory)
+        self.base_url = base_url
+
+    def get_file_name(self, file, submission_id) -> str:
+        """Returns the name of the given file in the directory. The submission ID makes it unique per article."""
+
+        suffix = None
+        if isinstance(getattr(file, "name", None), str):
+            suffix = get_file_suffix(file.name)
+        if not suffix:
+            mime_type_name = get_name_for_mime_type(getattr(file, "mime_type", None))
+            suffix = mime_type_name.lower() if mime_type_name else DEFAULT_FILE_SUFFIX
+
+        return "{submission_id}.{suffix}".format(
+            submission_id=submission_id, suffix=suffix
+        )
+
+    def get_reference(self, file_name: str) -> str:
+        """Returns the source the XML references the stored file with the given name by."""
+
+        if self.base_url is not None:
+            return "{base_url}/{file_name}".format(
+                base_url=self.base_url.rstrip("/"), file_name=file_name
+            )
+        else:
+            return str((self.directory / file_name).absolute())
+
+    def store(self, file, submission_id, file_data_source=None) -> str:
+        """Stores the given file in the directory and returns its reference.
+        :param file: A file object, e.g. from the Visual Library.
+        :param submission_id: The submission ID of the file.
+        :param file_data_source: An object providing the data of the file with `iterate_data(file, chunk_size)`,
+        e.g. a DiskCache. If None, `iterate_file_data` is used.
+        :returns: The path or URL of the stored file.
+        :rtype: str
+
+        The file is written to a temporary file first, so that no incomplete files are referenced.
+        An existing file of the same name is replaced.
+        """
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        file_name = self.get_file_name(file, submission_id)
+        file_path = self.directory / file_name
+
+        local_path = getattr(file, "local_path", None)
+        if local_path is not None and self._link(local_path, file_path):
+            return self.get_reference(file_name)
+
+        if file_data_source is not None:
+            data_chunks = file_data_source.iterate_data(file, BASE64_CHUNK_SIZE)
+        else:
+            data_chunks = iterate_file_data(file, BASE64_CHUNK_SIZE)
+
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            prefix=self.TEMPORARY_FILE_PREFIX, dir=str(self.directory)
+        )
+        try:
+            with os.fdopen(file_descriptor, "wb") as temporary_file:
+                for data_chunk in data_chunks:
+                    temporary_file.write(data_chunk)
+            os.replace(temporary_path, str(file_path))
+        except BaseException:
+            self._remove(pathlib.Path(temporary_path))
+            raise
+
+        logger.debug("Stored %s as %s", file_name, file_path)
+        return self.get_reference(file_name)
+
+    def _link(self, source_path, file_path: pathlib.Path) -> bool:
+        """Hard-links the source path to the file path or copies it, if the file system does not allow links.
+        Returns False, if the source cannot be read at all.
+        """
+
+        temporary_path = file_path.with_name(
+            "{prefix}{name}".format(
+                prefix=self.TEMPORARY_FILE_PREFIX, name=file_path.name
+            )
+        )
+        self._remove(temporary_path)
+        try:
+            os.link(str(source_path), str(temporary_path))
+        except OSError:
+            try:
+                shutil.copyfile(str(source_path), str(temporary_path))
+            except OSError:
+                self._remove(temporary_path)
+                return False
+
+        os.replace(str(temporary_path), str(file_path))
+        return True
+
+    @staticmethod
+    def _remove(path: pathlib.Path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
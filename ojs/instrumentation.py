@@ -0,0 +1,152 @@
+import json
+import pathlib
+import threading
+import time
+import tracemalloc
+from collections import namedtuple
+from contextlib import contextmanager
+
+STAGE_CONSTRUCTION = "construction"
+STAGE_FETCH = "fetch"
+STAGE_PRETTY_PRINT = "pretty-print"
+STAGE_RENDER = "render"
+STAGE_STREAM = "stream"
+STAGE_VALIDATE = "validate"
+STAGE_WRITE = "write"
+
+StageMeasurement = namedtuple(
+    "StageMeasurement",
+    ["item_id", "item_type", "stage", "duration", "bytes_produced", "peak_memory"],
+)
+
+
+class StageRecord:
+    """Collects the output of a single stage while it is measured."""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.bytes_produced = None
+
+    def add_output(self, output):
+        """Adds the size of the given string or bytes to the bytes produced by the stage.
+        The size is only computed if the instrumentation is enabled.
+        """
+
+        if not self.enabled:
+            return
+
+        if isinstance(output, str):
+            output = output.encode("utf-8")
+        self.bytes_produced = (self.bytes_produced or 0) + len(output)
+
+
+class Instrumentation:
+    """Measures the stages of the XML generation and passes the measurements to the registered sinks.
+
+    A sink is any callable taking a StageMeasurement. Without sinks, nothing is measured at all.
+    With `trace_memory`, the peak of the memory allocated by Python during every stage is traced
+    with tracemalloc. This slows down the generation considerably. tracemalloc traces the whole process,
+    hence the peaks are only accurate, if a single stage is measured at a time.
+    """
+
+    def __init__(self, sinks=None, trace_memory: bool = False):
+        """
+        :param sinks: The callables the measurements are passed to.
+        :type sinks: list
+        :param trace_memory: Whether the memory peak of every stage is traced with tracemalloc.
+        :type trace_memory: bool
+        """
+
+        self.sinks = list(sinks) if sinks is not None else []
+        self.trace_memory = trace_memory
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sinks)
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    @contextmanager
+    def measure(self, stage: str, item):
+        """Measures the code inside the with-block as the given stage of the given item.
+        :param stage: The name of the stage, e.g. `STAGE_RENDER`.
+        :type stage: str
+        :param item: The object the stage works on. Its class name and ID are part of the measurement.
+        :type item: object
+        :returns: A StageRecord to add the produced output to.
+        :rtype: StageRecord
+        """
+
+        stage_record = StageRecord(self.enabled)
+        if not self.enabled:
+            yield stage_record
+            return
+
+        started_tracing = self._start_memory_tracing()
+        start_time = time.perf_counter()
+        try:
+            yield stage_record
+        finally:
+            duration = time.perf_counter() - start_time
+            peak_memory = self._stop_memory_tracing(started_tracing)
+
+            self.emit(
+                StageMeasurement(
+                    item_id=getattr(item, "id", None),
+                    item_type=item.__class__.__name__,
+                    stage=stage,
+                    duration=duration,
+                    bytes_produced=stage_record.bytes_produced,
+                    peak_memory=peak_memory,
+                )
+            )
+
+    def emit(self, measurement: StageMeasurement):
+        for sink in self.sinks:
+            sink(measurement)
+
+    def _start_memory_tracing(self) -> bool:
+        if not self.trace_memory:
+            return False
+
+        if tracemalloc.is_tracing():
+            # Python < 3.9 cannot reset the peak, it is then the peak since the tracing started
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            return False
+
+        tracemalloc.start()
+        return True
+
+    def _stop_memory_tracing(self, started_tracing: bool):
+        if not self.trace_memory:
+            return None
+
+        _, peak_memory = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+
+        return peak_memory
+
+
+NO_INSTRUMENTATION = Instrumentation()
+
+
+class JsonLinesSink:
+    """A sink that appends every measurement as a JSON object to a file.
+
+    Every measurement is written with a single call to `write` on a file opened in append mode,
+    so several processes can write to the same file.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = pathlib.Path(file_path)
+        self._lock = threading.Lock()
+
+    def __call__(self, measurement: StageMeasurement):
+        line = json.dumps(dict(measurement._asdict(), timestamp=time.time())) + "\n"
+
+        with self._lock:
+            with open(str(self.file_path), "a") as metrics_file:
+                metrics_file.write(line)
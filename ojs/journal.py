@@ -0,0 +1,79 @@
+import logging
+from collections import namedtuple
+
+logger = logging.getLogger("XmlGenerator.Journal")
+
+# A single import document of a journal, named by the ID of the exported object
+JournalDocument = namedtuple("JournalDocument", ["name", "xml_string"])
+
+
+class JournalExporter:
+    """Exports a Visual Library journal into one import document per issue.
+
+    OJS knows no volumes containing issues, hence a journal cannot be converted into a single OJS object.
+    Instead, the journal is walked lazily: every issue of a volume, every volume containing articles only and
+    every standalone article of the journal is converted and rendered on its own, as soon as it is reached.
+    Only the object currently exported is held in memory.
+    """
+
+    def __init__(self, ojs_xml_generator):
+        """
+        :param ojs_xml_generator: The factory converting the elements of the journal into OJS objects.
+        :type ojs_xml_generator: OjsXmlGenerator
+        """
+
+        self.ojs_xml_generator = ojs_xml_generator
+
+    @staticmethod
+    def iterate_exportable_elements(vl_journal):
+        """Yields the elements of a journal that are imported in a document of their own, in the order of the journal:
+        the issues of every volume (or the volume itself, if it contains articles only), followed by the
+        standalone articles of the journal.
+        """
+
+        for vl_volume in vl_journal.volumes:
+            if vl_volume.issues:
+                yield from vl_volume.issues
+            else:
+                yield vl_volume
+
+        for vl_article in vl_journal.articles:
+            vl_article.is_standalone = True
+            yield vl_article
+
+    def iterate_ojs_objects(self, vl_journal):
+        """Yields the OJS object of every exportable element of the given journal, converted when it is reached.
+        :returns: A generator of OjsIssues, OjsVolumes and OjsArticles.
+        :rtype: Generator[XmlGenerator]
+        """
+
+        for vl_element in self.iterate_exportable_elements(vl_journal):
+            logger.info(
+                "Converting %s %s of journal %s",
+                vl_element.__class__.__name__,
+                vl_element.id,
+                vl_journal.id,
+            )
+            yield self.ojs_xml_generator.convert_vl_objecto_to_ojs_object(vl_element)
+
+    def generate_xml_documents(self, vl_journal, max_document_size: int = None):
+        """Yields the import documents of the given journal one by one.
+        :param max_document_size: If given, the XML of every object is split into documents of at most
+        this many bytes, named "<id>-<number>".
+        :type max_document_size: int
+        :returns: A generator of JournalDocuments.
+        :rtype: Generator[JournalDocument]
+        """
+
+        for ojs_object in self.iterate_ojs_objects(vl_journal):
+            if max_document_size is None:
+                yield JournalDocument(str(ojs_object.id), ojs_object.generate_xml())
+                continue
+
+            for document_number, xml_string in enumerate(
+                ojs_object.generate_xml_documents(max_document_size), start=1
+            ):
+                yield JournalDocument(
+                    "{id}-{number}".format(id=ojs_object.id, number=document_number),
+                    xml_string,
+                )
@@ -0,0 +1,75 @@
+import logging
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+LOGGER_NAME = "XmlGenerator"
+LOG_FORMAT = "[%(asctime)s] [%(levelname)s] - %(message)s"
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+DEFAULT_LOG_LEVEL = "INFO"
+
+
+def get_log_level(log_level) -> int:
+    """Returns the numeric value of a log level name like "DEBUG" or of a numeric log level.
+    :except: If the name is unknown, a ValueError is thrown.
+    """
+
+    if isinstance(log_level, int):
+        return log_level
+
+    if str(log_level).upper() not in LOG_LEVELS:
+        raise ValueError(
+            'Unknown log level "{log_level}"! Choose one of: {log_levels}'.format(
+                log_level=log_level, log_levels=", ".join(LOG_LEVELS)
+            )
+        )
+    return getattr(logging, str(log_level).upper())
+
+
+def attach_to_log_queue(log_queue, log_level=DEFAULT_LOG_LEVEL):
+    """Sends the records of the package loggers to the given queue, replacing their current handlers.
+    Use it as initializer of worker processes, so that their records are written by the listener of the main process.
+    :param log_queue: A queue shared with the process running the QueueListener, e.g. a `multiprocessing.Queue`.
+    """
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(get_log_level(log_level))
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(QueueHandler(log_queue))
+    # The listener passes the records to its own handlers, hence they must not reach the root logger twice
+    logger.propagate = False
+
+
+def start_logging(log_queue, log_level=DEFAULT_LOG_LEVEL, stream=None) -> QueueListener:
+    """Writes the records of the package loggers to a stream in a background thread.
+    :param log_queue: The queue the records are passed through, e.g. a `queue.SimpleQueue`
+    or a `multiprocessing.Queue`, if worker processes log as well.
+    :param log_level: The minimal level of the written records, as name or number.
+    Records below it are dropped before their message is formatted.
+    :param stream: The stream to write to. Default is the standard output.
+    :returns: The started listener. Pass it to `stop_logging` to write the remaining records.
+    :rtype: QueueListener
+
+    The logging call only puts the record into the queue. Writing it to the stream happens
+    in the thread of the listener, so slow output does not delay the export.
+    """
+
+    stream_handler = logging.StreamHandler(stream if stream is not None else sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    attach_to_log_queue(log_queue, log_level)
+    queue_listener = QueueListener(log_queue, stream_handler)
+    queue_listener.start()
+    return queue_listener
+
+
+def stop_logging(queue_listener: QueueListener):
+    """Writes the remaining records of the listener and detaches the package loggers from its queue."""
+
+    queue_listener.stop()
+
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        if isinstance(handler, QueueHandler):
+            logger.removeHandler(handler)
+    logger.propagate = True
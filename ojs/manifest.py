@@ -0,0 +1,126 @@
+import hashlib
+import json
+import pathlib
+
+from ojs.xmlgenerator import OJS_XML_TEMPLATE_FOLDER, ROOT_DIRECTORY_PATH
+
+FILE_ATTRIBUTES_TO_HASH = (
+    "name",
+    "mime_type",
+    "size",
+    "date_uploaded",
+    "date_modified",
+)
+
+
+def _iterate_files(vl_object):
+    files = getattr(vl_object, "files", None) or []
+    yield from files
+
+    teaser_image_file = getattr(vl_object, "teaser_image_file", None)
+    if teaser_image_file is not None:
+        yield teaser_image_file
+
+
+def _iterate_hashable_parts(vl_object):
+    """Yields the strings describing a Visual Library element and its own files.
+    The children are not visited. Their structure is part of the METS of the element, and visiting them would
+    load and serialize the whole journal, volume or issue before the first document is written.
+    """
+
+    yield "{vl_type}:{id}".format(vl_type=vl_object.__class__.__name__, id=vl_object.id)
+    yield str(getattr(vl_object, "metadata", ""))
+
+    for file in _iterate_files(vl_object):
+        yield "|".join(
+            str(getattr(file, attribute, None)) for attribute in FILE_ATTRIBUTES_TO_HASH
+        )
+
+
+def _iterate_template_file_contents():
+    template_directory = ROOT_DIRECTORY_PATH / OJS_XML_TEMPLATE_FOLDER
+    for template_file_path in sorted(template_directory.glob("*.xml")):
+        yield template_file_path.read_bytes()
+
+
+def compute_content_hash(vl_object, template_configuration: dict) -> str:
+    """Computes a hash over everything the XML of a Visual Library element depends on.
+    :param vl_object: The Visual Library element to export.
+    :type vl_object: VisualLibraryExportElement
+    :param template_configuration: The effective template configuration.
+    :type template_configuration: dict
+    :returns: A SHA-256 hex digest of the METS/MODS metadata and the file information of the element,
+    the template configuration and the templates.
+    :rtype: str
+
+    A change made only to the record of a child, which leaves the METS of the element as it is, is not detected.
+    Export such items again with `--force`.
+    """
+
+    content_hash = hashlib.sha256()
+
+    for part in _iterate_hashable_parts(vl_object):
+        content_hash.update(part.encode("utf-8"))
+        content_hash.update(b"\0")
+
+    content_hash.update(
+        json.dumps(template_configuration, sort_keys=True, default=str).encode("utf-8")
+    )
+
+    for template_file_content in _iterate_template_file_contents():
+        content_hash.update(template_file_content)
+
+    return content_hash.hexdigest()
+
+
+class ExportManifest:
+    """A JSON-lines file recording the content hash and the output files of every exported item.
+
+    Every export appends a line, hence the last line of an item is the valid one.
+    """
+
+    MANIFEST_FILE_NAME = "manifest.jsonl"
+
+    def __init__(self, output_directory):
+        self.manifest_file_path = (
+            pathlib.Path(output_directory) / self.MANIFEST_FILE_NAME
+        )
+        self._entries = self._read_entries()
+
+    def get_content_hash(self, item_id: str):
+        """Returns the hash of the last export of the given item, if all of its output files still exist.
+        Otherwise None is returned.
+        """
+
+        entry = self._entries.get(item_id)
+        if entry is None:
+            return None
+
+        output_files_exist = all(
+            pathlib.Path(output_file).exists() for output_file in entry["output_files"]
+        )
+        return entry["content_hash"] if output_files_exist else None
+
+    def record(self, item_id: str, content_hash: str, output_files: list):
+        entry = {
+            "item_id": item_id,
+            "content_hash": content_hash,
+            "output_files": output_files,
+        }
+        self._entries[item_id] = entry
+
+        with open(str(self.manifest_file_path), "a") as manifest_file:
+            manifest_file.write(json.dumps(entry) + "\n")
+
+    def _read_entries(self) -> dict:
+        entries = {}
+        if not self.manifest_file_path.exists():
+            return entries
+
+        with open(str(self.manifest_file_path), "r") as manifest_file:
+            for line in manifest_file:
+                if line.strip():
+                    entry = json.loads(line)
+                    entries[entry["item_id"]] = entry
+
+        return entries
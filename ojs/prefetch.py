@@ -0,0 +1,258 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from templates.template_functions import (
+    BASE64_CHUNK_SIZE,
+    FILE_EMBEDDING_HREF,
+    iterate_file_data,
+)
+
+logger = logging.getLogger("XmlGenerator.Prefetch")
+
+DEFAULT_PREFETCH_WORKERS = 4
+DEFAULT_MAX_IN_FLIGHT_BYTES = 64 * 1024 * 1024
+MAX_QUEUED_CHUNKS_PER_DOWNLOAD = 4
+
+
+def iterate_files_in_render_order(ojs_object):
+    """Yields the files embedded into the XML of the given OJS object in the order the templates embed them:
+    the teaser image and the galleys of every issue, followed by the submission files of its articles.
+    Submission files referenced by their URL instead of being embedded are left out.
+
+    Lazily converted issues and articles (see `LazyOjsObjectList`) are not converted to find their files:
+    a converted issue or article embeds the files of its Visual Library element, which are read directly.
+    """
+
+    include_submission_files = (
+        getattr(ojs_object, "file_embedding", None) != FILE_EMBEDDING_HREF
+    )
+
+    if not hasattr(ojs_object, "articles"):
+        # A single article
+        if include_submission_files:
+            yield from ojs_object.submission_files
+        return
+
+    issues = getattr(ojs_object, "issues", None)
+    vl_issues = getattr(issues, "vl_objects", None)
+    if vl_issues is not None:
+        # An OjsIssue takes its teaser image and articles from its Visual Library issue and has no galleys
+        issue_contents = (
+            (
+                vl_issue.teaser_image_file,
+                [],
+                _iterate_files_of_vl_articles(vl_issue.articles),
+            )
+            for vl_issue in vl_issues
+        )
+    else:
+        issue_contents = (
+            (
+                getattr(issue, "teaser_image_file", None),
+                getattr(issue, "files", None) or [],
+                _iterate_submission_files(issue.articles),
+            )
+            for issue in issues or [ojs_object]
+        )
+
+    for teaser_image_file, galley_files, submission_files in issue_contents:
+        if teaser_image_file is not None and not ojs_object.use_pre_3_2_schema:
+            yield teaser_image_file
+
+        yield from galley_files
+
+        if include_submission_files:
+            yield from submission_files
+
+
+def _iterate_submission_files(articles):
+    vl_articles = getattr(articles, "vl_objects", None)
+    if vl_articles is not None:
+        yield from _iterate_files_of_vl_articles(vl_articles)
+    else:
+        for article in articles:
+            yield from article.submission_files
+
+
+def _iterate_files_of_vl_articles(vl_articles):
+    # The submission files of an OjsArticle are the files of its Visual Library article
+    for vl_article in vl_articles:
+        yield from vl_article.files
+
+
+class _Download:
+    """The state of a single prefetched file, shared by its download thread and the render."""
+
+    def __init__(self):
+        self.data_chunks = deque()
+        self.requested = False
+        self.abandoned = False
+        self.finished = False
+        self.error = None
+
+
+class FilePrefetcher:
+    """Downloads files in background threads while the XML is rendered.
+
+    The prefetcher is a file data source for the templates (see `iterate_base64_encoded_data`): the render takes
+    the data of a file from the prefetcher, which waits for the next chunk if it is not downloaded yet.
+    At most `max_workers` files are downloaded at once. Every download passes its chunks through a queue of
+    at most `MAX_QUEUED_CHUNKS_PER_DOWNLOAD` chunks, and all queued chunks together count against
+    `max_in_flight_bytes`. Only the file the render waits for may exceed the budget by a single chunk,
+    so the render always proceeds. Files that were not started yet when the render reaches them are streamed
+    directly instead.
+    """
+
+    def __init__(
+        self,
+        files,
+        max_workers: int = DEFAULT_PREFETCH_WORKERS,
+        max_in_flight_bytes: int = DEFAULT_MAX_IN_FLIGHT_BYTES,
+        file_data_source=None,
+    ):
+        """
+        :param files: The files to download, in the order they are rendered.
+        :type files: Iterable
+        :param max_workers: The maximal number of concurrent downloads.
+        :type max_workers: int
+        :param max_in_flight_bytes: The maximal number of downloaded bytes not consumed by the render yet.
+        :type max_in_flight_bytes: int
+        :param file_data_source: An object providing the data of a file with `iterate_data(file, chunk_size)`,
+        e.g. a DiskCache. If None, `iterate_file_data` is used.
+        """
+
+        self.max_in_flight_bytes = max_in_flight_bytes
+        self.file_data_source = file_data_source
+
+        self._condition = threading.Condition()
+        self._in_flight_bytes = 0
+        self._closed = False
+        self._downloads = {}
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="prefetch"
+        )
+        for file in files:
+            file_key = id(file)
+            if file_key not in self._downloads:
+                download = _Download()
+                future = self._executor.submit(self._download, download, file)
+                self._downloads[file_key] = (future, download)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.close()
+
+    def close(self):
+        """Cancels all downloads that were not started and waits for the running ones to stop."""
+
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+        for future, _ in self._downloads.values():
+            future.cancel()
+        self._downloads.clear()
+        self._executor.shutdown(wait=True)
+
+    def iterate_data(self, file, chunk_size: int = BASE64_CHUNK_SIZE):
+        """Yields the binary content of a file chunk by chunk, the same way `iterate_file_data` does."""
+
+        future, download = self._downloads.pop(id(file), (None, None))
+        if future is None or future.cancel():
+            # Not prefetched or not started yet, hence it is streamed directly
+            yield from self._iterate_source_data(file, chunk_size)
+            return
+
+        with self._condition:
+            download.requested = True
+            self._condition.notify_all()
+
+        try:
+            while True:
+                data_chunk = self._take_data_chunk(download)
+                if data_chunk is None:
+                    break
+
+                data_view = memoryview(data_chunk)
+                for start in range(0, len(data_view), chunk_size):
+                    yield bytes(data_view[start : start + chunk_size])
+        finally:
+            # Stops the download, if the render did not read the whole file
+            with self._condition:
+                download.abandoned = True
+                self._in_flight_bytes -= sum(map(len, download.data_chunks))
+                download.data_chunks.clear()
+                self._condition.notify_all()
+
+    def _take_data_chunk(self, download: _Download):
+        """Waits for the next chunk of the given download and returns it. Returns None after the last chunk."""
+
+        with self._condition:
+            while not download.data_chunks and not download.finished:
+                self._condition.wait()
+
+            if download.data_chunks:
+                data_chunk = download.data_chunks.popleft()
+                self._in_flight_bytes -= len(data_chunk)
+                self._condition.notify_all()
+                return data_chunk
+
+        if download.error is not None:
+            raise download.error
+        return None
+
+    def _download(self, download: _Download, file):
+        try:
+            for data_chunk in self._iterate_source_data(file, BASE64_CHUNK_SIZE):
+                if not self._queue_data_chunk(download, data_chunk):
+                    return
+            logger.debug("Prefetched %s", getattr(file, "name", id(file)))
+        except Exception as error:
+            # Raised by the render, when it reaches the failed chunk
+            download.error = error
+        finally:
+            with self._condition:
+                download.finished = True
+                self._condition.notify_all()
+
+    def _iterate_source_data(self, file, chunk_size: int):
+        if self.file_data_source is not None:
+            return self.file_data_source.iterate_data(file, chunk_size)
+        else:
+            return iterate_file_data(file, chunk_size)
+
+    def _queue_data_chunk(self, download: _Download, data_chunk: bytes) -> bool:
+        """Blocks until the chunk fits into the queue of the download and into the budget, then queues it.
+        Returns False, if the prefetcher is closed or the render does not read the file anymore.
+        """
+
+        with self._condition:
+            while not (self._closed or download.abandoned) and not self._fits(
+                download, len(data_chunk)
+            ):
+                self._condition.wait()
+
+            if self._closed or download.abandoned:
+                return False
+
+            self._in_flight_bytes += len(data_chunk)
+            download.data_chunks.append(data_chunk)
+            self._condition.notify_all()
+            return True
+
+    def _fits(self, download: _Download, size: int) -> bool:
+        if len(download.data_chunks) >= MAX_QUEUED_CHUNKS_PER_DOWNLOAD:
+            return False
+
+        # A single chunk of the file the render waits for is always allowed, otherwise the render could wait
+        # for the budget held by files rendered later
+        return (
+            self._in_flight_bytes + size <= self.max_in_flight_bytes
+            or self._in_flight_bytes == 0
+            or (download.requested and not download.data_chunks)
+        )
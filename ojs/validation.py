@@ -0,0 +1,64 @@
+import pathlib
+from functools import lru_cache
+
+from lxml import etree
+
+XSD_DIRECTORY_PATH = pathlib.Path(__file__).parent / "xsd"
+OJS_NATIVE_XSD_FILE_NAME = "ojs-native.xsd"
+# The schema of OJS 3.1.2-1, used with `use_pre_3_2_schema`
+PRE_OJS_3_2_XSD_DIRECTORY_NAME = "3.1.2-1"
+
+
+@lru_cache(maxsize=None)
+def get_ojs_native_schema(use_pre_3_2_schema: bool = False) -> etree.XMLSchema:
+    """Returns the compiled OJS native XML schema. Every schema is compiled only once per process.
+    :param use_pre_3_2_schema: Whether the schema of OJS before 3.2 is returned instead of the one of OJS 3.3.
+    :type use_pre_3_2_schema: bool
+    :rtype: etree.XMLSchema
+    """
+
+    xsd_directory_path = XSD_DIRECTORY_PATH
+    if use_pre_3_2_schema:
+        xsd_directory_path = xsd_directory_path / PRE_OJS_3_2_XSD_DIRECTORY_NAME
+
+    # Parsed from its path, the included schemas are resolved relative to the file
+    xsd_document = etree.parse(str(xsd_directory_path / OJS_NATIVE_XSD_FILE_NAME))
+    return etree.XMLSchema(xsd_document)
+
+
+def validate_xml_file(xml_file, use_pre_3_2_schema: bool = False):
+    """Validates an XML file against the OJS native XML schema without building the whole tree in memory.
+    :param xml_file: The path of the file or a binary file-like object, e.g. an opened compressed file.
+    :param use_pre_3_2_schema: Whether the file is validated against the schema of OJS before 3.2.
+    :type use_pre_3_2_schema: bool
+    :except: An `etree.XMLSyntaxError` is raised at the first violation of the schema.
+
+    The file is parsed incrementally and every element is removed as soon as it is parsed, hence only
+    the ancestors of the current element are held in memory.
+    """
+
+    if isinstance(xml_file, pathlib.Path):
+        xml_file = str(xml_file)
+
+    xml_elements = etree.iterparse(
+        xml_file,
+        events=("end",),
+        schema=get_ojs_native_schema(use_pre_3_2_schema),
+        huge_tree=True,
+    )
+    for _, element in xml_elements:
+        element.clear()
+        # The preceding siblings are already parsed and empty
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+
+def validate_xml_string(xml_string: str, use_pre_3_2_schema: bool = False):
+    """Validates an XML string against the OJS native XML schema.
+    :except: An `etree.XMLSyntaxError` is raised, if the XML violates the schema.
+    """
+
+    xml_parser = etree.XMLParser(
+        schema=get_ojs_native_schema(use_pre_3_2_schema), huge_tree=True
+    )
+    etree.fromstring(xml_string.encode("utf-8"), xml_parser)
@@ -1,37 +1,50 @@
+import copy
+import io
+import itertools
 import logging
 import os
 import pathlib
-import sys
-import xml.dom.minidom
+import re
 from abc import ABC, abstractmethod
 from collections import defaultdict, namedtuple
 from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
 
-from jinja2 import Environment, FileSystemLoader
-from VisualLibrary import (
-    Article,
-    Issue,
-    Journal,
-    VisualLibraryExportElement,
-    Volume,
-)
+from VisualLibrary import Article, Issue, Journal, VisualLibraryExportElement, Volume
 from VisualLibrary.VisualLibrary import remove_letters_from_alphanumeric_string
 
 from configuration.Configurator import Configurator
-from templates.template_functions import register_custom_filters_to_environment
+from ojs.filestore import ExternalFileDirectory
+from ojs.instrumentation import (
+    NO_INSTRUMENTATION,
+    STAGE_CONSTRUCTION,
+    STAGE_PRETTY_PRINT,
+    STAGE_RENDER,
+    STAGE_STREAM,
+    Instrumentation,
+)
+from ojs.logs import LOGGER_NAME
+from templates.template_functions import (
+    DUMMY_AUTHOR,
+    FILE_EMBEDDING_EXTERNAL_DIRECTORY,
+    FILE_EMBEDDING_INLINE,
+    FILE_EMBEDDINGS,
+    FILE_STORE_VARIABLE_NAME,
+    FileIdAllocator,
+    OjsAuthor,
+    extract_isodate_from_datetime,
+    get_name_for_mime_type,
+    get_value_for_language,
+    normalize_user_name,
+    register_custom_filters_to_environment,
+)
 
 this_files_directory = os.path.dirname(os.path.realpath(__file__))
 ROOT_DIRECTORY_PATH = pathlib.Path(this_files_directory).parents[0]
 
-log_format = logging.Formatter("[%(asctime)s] [%(levelname)s] - %(message)s")
-logger = logging.getLogger("XmlGenerator")
-logger.setLevel(logging.DEBUG)
-
-# writing to stdout
-handler = logging.StreamHandler(sys.stdout)
-handler.setLevel(logging.DEBUG)
-handler.setFormatter(log_format)
-logger.addHandler(handler)
+# No handlers are attached here: the application configures the output, e.g. with `ojs.logs.start_logging`
+logger = logging.getLogger(LOGGER_NAME)
 
 
 ISO_LANGUAGES = {
@@ -76,30 +89,233 @@ def normalize_language_keys_in_dictionary(dictionary_with_language_keys):
         }
 
 
+def merge_languages(languages, additional_languages) -> tuple:
+    """Returns the given languages followed by the additional languages not given yet, without any None."""
+
+    merged_languages = dict.fromkeys(languages)
+    merged_languages.update(dict.fromkeys(additional_languages))
+    merged_languages.pop(None, None)
+
+    return tuple(merged_languages)
+
+
+# The words OJS stores as the prefix of a title, if the title starts with them, per locale.
+# A locale configured in `title_prefixes` replaces its default words.
+TITLE_PREFIX_WORDS = MappingProxyType(
+    {
+        "de_DE": ("der", "die", "das", "ein", "eine", "eines", "zu", "zur", "zum"),
+        "en_US": ("a", "an", "the", "on"),
+        "fr_FR": ("le", "la", "les", "un", "une", "des", "du"),
+    }
+)
+
+
+@lru_cache(maxsize=None)
+def compile_title_prefix_pattern(prefix_words: frozenset):
+    """Returns a regular expression matching the prefix words a title starts with, each followed by a space.
+    :param prefix_words: The lower case prefix words of a locale.
+    :type prefix_words: frozenset
+    :rtype: re.Pattern
+
+    Every set of prefix words is compiled only once per process.
+    """
+
+    alternatives = "|".join(
+        re.escape(prefix_word)
+        for prefix_word in sorted(prefix_words, key=len, reverse=True)
+    )
+    return re.compile(
+        "(?:(?:{alternatives}) )+".format(alternatives=alternatives), re.IGNORECASE
+    )
+
+
+OJS_XML_TEMPLATE_FOLDER = "templates"
+
+
+@lru_cache(maxsize=None)
+def get_template_environment(bytecode_cache_directory: str = None):
+    """Returns the template environment shared by all XML generating objects of this process.
+    :param bytecode_cache_directory: A directory to store the compiled templates in. If None, the templates
+    are compiled once per process only.
+    :type bytecode_cache_directory: str
+    :returns: A Jinja environment with all custom filters registered.
+    :rtype: jinja2.Environment
+
+    The environment caches the compiled templates, hence every template is only compiled once per process.
+    With a bytecode cache directory, the compilation is also skipped in subsequent runs.
+    """
+
+    # Jinja is imported on the first rendering, so that importing this module stays fast
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+    template_file_loader = FileSystemLoader(
+        str(ROOT_DIRECTORY_PATH.absolute() / OJS_XML_TEMPLATE_FOLDER)
+    )
+
+    bytecode_cache = None
+    if bytecode_cache_directory is not None:
+        pathlib.Path(bytecode_cache_directory).mkdir(parents=True, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(str(bytecode_cache_directory))
+
+    template_environment = Environment(
+        loader=template_file_loader, autoescape=True, bytecode_cache=bytecode_cache
+    )
+    register_custom_filters_to_environment(template_environment)
+
+    return template_environment
+
+
+class LazyOjsObjectList:
+    """A read-only list of OJS objects, which are converted from their Visual Library elements only when accessed.
+
+    Every access converts the element again and no converted object is kept. Hence, while a template iterates
+    the list, only the object currently rendered is held in memory.
+
+    In contrast to the former list, changes to an accessed object are lost: after
+    `ojs_issue.articles[0].title = title`, the rendered article still has its original title. To change
+    the objects, convert them once and assign the list, e.g. `ojs_issue.articles = list(ojs_issue.articles)`.
+    """
+
+    def __init__(self, vl_objects, convert_vl_object):
+        """
+        :param vl_objects: The Visual Library elements to convert.
+        :type vl_objects: list
+        :param convert_vl_object: A function converting a single Visual Library element into an OJS object.
+        :type convert_vl_object: Callable
+        """
+
+        self._vl_objects = list(vl_objects)
+        self._convert_vl_object = convert_vl_object
+
+    @property
+    def vl_objects(self) -> tuple:
+        """The Visual Library elements of the list, to inspect them without converting them."""
+
+        return tuple(self._vl_objects)
+
+    def __iter__(self):
+        for vl_object in self._vl_objects:
+            yield self._convert_vl_object(vl_object)
+
+    def __len__(self):
+        return len(self._vl_objects)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [
+                self._convert_vl_object(vl_object)
+                for vl_object in self._vl_objects[index]
+            ]
+
+        return self._convert_vl_object(self._vl_objects[index])
+
+
 class XmlGenerator(ABC):
     """An abstract base class that provides functions and the template environment to generate OJS XML."""
 
-    OJS_XML_TEMPLATE_FOLDER = "templates"
+    FILE_ID_GENERATOR_NAME = "generate_unique_file_id"
+    OJS_XML_TEMPLATE_FOLDER = OJS_XML_TEMPLATE_FOLDER
+    PRETTY_PRINTER_LXML = "lxml"
+    PRETTY_PRINTER_MINIDOM = "minidom"
+    PRETTY_PRINTER_NONE = "none"
+    PRETTY_PRINTERS = {PRETTY_PRINTER_LXML, PRETTY_PRINTER_MINIDOM, PRETTY_PRINTER_NONE}
+    RENDERER_JINJA = "jinja"
+    RENDERER_LXML = "lxml"
+    RENDERERS = {RENDERER_JINJA, RENDERER_LXML}
+
+    LANGUAGES_VARIABLE_NAME = Configurator.KEYWORD_LANGUAGES
+    # The namedtuple returned by `get_localized_fields`, its fields are computed from the attributes of the same name
+    LOCALIZED_FIELDS = None
 
     def __init__(self, template_configuration: dict):
-        template_file_loader = FileSystemLoader(
-            str(ROOT_DIRECTORY_PATH.absolute() / self.OJS_XML_TEMPLATE_FOLDER)
-        )
-        self.template_environment = Environment(
-            loader=template_file_loader, autoescape=True
+        self._localized_fields = {}
+
+        # The configuration is shared by all generated objects, hence it must never be changed by one of them
+        if template_configuration is None:
+            template_configuration = {}
+        if not isinstance(template_configuration, MappingProxyType):
+            template_configuration = MappingProxyType(template_configuration)
+        self.template_configuration = template_configuration
+
+        # The configured languages and the languages of all articles in the generated document
+        self.languages = merge_languages(
+            self.template_configuration.get(self.LANGUAGES_VARIABLE_NAME) or [], []
         )
-        register_custom_filters_to_environment(self.template_environment)
-
-        self.template_configuration = (
-            template_configuration if template_configuration is not None else {}
+        self.template_environment = get_template_environment(
+            self.template_configuration.get(
+                Configurator.KEYWORD_BYTECODE_CACHE_DIRECTORY
+            )
         )
         self._temporary_configurations = {}
         self.use_pre_3_2_schema = False
+        self.instrumentation = NO_INSTRUMENTATION
 
         use_old_xml_schema = template_configuration.get(Configurator.KEYWORD_PRE_SCHEMA)
         if use_old_xml_schema is not None:
             self.use_pre_3_2_schema = use_old_xml_schema
 
+        self.pretty_printer = self.template_configuration.get(
+            Configurator.KEYWORD_PRETTY, self.PRETTY_PRINTER_MINIDOM
+        )
+        if self.pretty_printer not in self.PRETTY_PRINTERS:
+            raise ValueError(
+                'Unknown pretty printer "{pretty}"! Choose one of: {pretty_printers}'.format(
+                    pretty=self.pretty_printer,
+                    pretty_printers=", ".join(sorted(self.PRETTY_PRINTERS)),
+                )
+            )
+
+        self.renderer = self.template_configuration.get(
+            Configurator.KEYWORD_RENDERER, self.RENDERER_JINJA
+        )
+        if self.renderer not in self.RENDERERS:
+            raise ValueError(
+                'Unknown renderer "{renderer}"! Choose one of: {renderers}'.format(
+                    renderer=self.renderer,
+                    renderers=", ".join(sorted(self.RENDERERS)),
+                )
+            )
+
+        self.file_embedding = self.template_configuration.get(
+            Configurator.KEYWORD_FILE_EMBEDDING, FILE_EMBEDDING_INLINE
+        )
+        if self.file_embedding not in FILE_EMBEDDINGS:
+            raise ValueError(
+                'Unknown file embedding "{file_embedding}"! Choose one of: {file_embeddings}'.format(
+                    file_embedding=self.file_embedding,
+                    file_embeddings=", ".join(sorted(FILE_EMBEDDINGS)),
+                )
+            )
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+
+        if self.LOCALIZED_FIELDS is not None and name in self.LOCALIZED_FIELDS._fields:
+            # The localized fields are computed from these attributes and have to be computed again
+            self._localized_fields.clear()
+
+    def get_localized_fields(self, language):
+        """Returns the fields of `LOCALIZED_FIELDS` of this object for the given language.
+        The fields of every language are computed only once, so the templates can look them up in every loop.
+        A missing attribute results in a field of None.
+        :param language: An ISO language, e.g. "de_DE".
+        :type language: str
+        """
+
+        localized_fields = self._localized_fields.get(language)
+        if localized_fields is None:
+            localized_fields = self.LOCALIZED_FIELDS(
+                *(
+                    get_value_for_language(
+                        getattr(self, attribute_name, None), language
+                    )
+                    for attribute_name in self.LOCALIZED_FIELDS._fields
+                )
+            )
+            self._localized_fields[language] = localized_fields
+
+        return localized_fields
+
     @property
     @abstractmethod
     def template_file_name(self):
@@ -130,13 +346,73 @@ class XmlGenerator(ABC):
     def clear_template_configuration_from_this_object(self):
         self._temporary_configurations.clear()
 
-    def _prepare_xml_generation_and_get_template(self):
-        configuration = self.template_configuration.copy()
+    def create_file_id_allocator(self) -> FileIdAllocator:
+        """Returns a new FileIdAllocator for a single rendering of this object.
+        If `namespace_file_ids` is configured, the file IDs are prefixed with the ID of this object.
+        """
+
+        namespace = None
+        if self.template_configuration.get(Configurator.KEYWORD_NAMESPACE_FILE_IDS):
+            namespace = remove_letters_from_alphanumeric_string(str(self.id))
+
+        return FileIdAllocator(namespace)
+
+    def _prepare_render_context(self, file_id_allocator=None) -> MappingProxyType:
+        """Returns the variables of a single rendering of this object, used by the templates and the lxml writer."""
+
+        if file_id_allocator is None:
+            file_id_allocator = self.create_file_id_allocator()
+
+        configuration = dict(self.template_configuration)
         configuration.update(self._temporary_configurations)
+        configuration[self.LANGUAGES_VARIABLE_NAME] = self.languages
+        configuration[
+            self.FILE_ID_GENERATOR_NAME
+        ] = file_id_allocator.generate_unique_file_id
+
+        if (
+            self.file_embedding == FILE_EMBEDDING_EXTERNAL_DIRECTORY
+            and configuration.get(FILE_STORE_VARIABLE_NAME) is None
+        ):
+            configuration[FILE_STORE_VARIABLE_NAME] = self._create_file_store()
 
+        return MappingProxyType(configuration)
+
+    def _create_file_store(self) -> ExternalFileDirectory:
+        file_directory = self.template_configuration.get(
+            Configurator.KEYWORD_FILE_DIRECTORY
+        )
+        if file_directory is None:
+            raise ValueError(
+                'The file embedding "{file_embedding}" needs a "{file_directory}" to store the files in!'.format(
+                    file_embedding=self.file_embedding,
+                    file_directory=Configurator.KEYWORD_FILE_DIRECTORY,
+                )
+            )
+
+        return ExternalFileDirectory(
+            file_directory,
+            self.template_configuration.get(Configurator.KEYWORD_FILE_BASE_URL),
+        )
+
+    def _prepare_xml_generation_and_get_template(self, file_id_allocator=None):
         return (
             self.template_environment.get_template(self.template_file_name),
-            configuration,
+            self._prepare_render_context(file_id_allocator),
+        )
+
+    def add_languages_of_vl_articles(self, vl_articles):
+        """Adds the primary languages of the given articles to the languages of the generated document.
+        If an article has a language that is not configured, the locale specific data are still rendered,
+        because otherwise OJS will complain at import!
+        """
+
+        self.languages = merge_languages(
+            self.languages,
+            (
+                OjsArticle.get_language_of_vl_article(vl_article)
+                for vl_article in vl_articles
+            ),
         )
 
     def generate_xml(self):
@@ -145,33 +421,160 @@ class XmlGenerator(ABC):
         :rtype: str
         """
 
-        logger.info("Start creating XML")
-        logger.debug(
-            "Using configuration: {config}".format(config=self.template_configuration)
-        )
+        logger.debug("Start creating XML")
+        logger.debug("Using configuration: %s", self.template_configuration)
 
-        template, configuration = self._prepare_xml_generation_and_get_template()
-        xml_string = template.render(configuration)
+        with self.instrumentation.measure(STAGE_RENDER, self) as stage:
+            xml_string = self._render_xml()
+            stage.add_output(xml_string)
 
         self.clear_template_configuration_from_this_object()
 
-        prettified_xml_string = xml.dom.minidom.parseString(xml_string).toprettyxml()
-        return self._remove_empty_lines_from_xml(prettified_xml_string)
+        with self.instrumentation.measure(STAGE_PRETTY_PRINT, self) as stage:
+            prettified_xml_string = self._prettify_xml(xml_string)
+            xml_string = self._remove_empty_lines_from_xml(prettified_xml_string)
+            stage.add_output(xml_string)
+
+        return xml_string
+
+    def generate_xml_to(self, output_file):
+        """Writes the XML of the inheriting child class chunk by chunk into the given file-like object.
+        :param output_file: A text file-like object providing a `write` method (e.g. an opened file or socket).
+        :type output_file: io.TextIOBase
+
+        In contrast to `generate_xml`_, the rendered template is never held in memory as a whole and
+        is not pretty-printed. Only the indentation of the templates is used and empty lines are removed
+        on the fly. Hence, the peak memory is bounded by the largest single chunk of the template rendering.
+        """
+
+        logger.debug("Start streaming XML")
+
+        try:
+            with self.instrumentation.measure(STAGE_STREAM, self) as stage:
+                if self.renderer == self.RENDERER_LXML:
+                    from ojs.xmlwriter import OjsXmlWriter, TextOutputAdapter
+
+                    xml_writer = OjsXmlWriter(self._prepare_render_context())
+                    xml_writer.write(
+                        TextOutputAdapter(output_file, stage.add_output),
+                        self.template_file_name,
+                    )
+                    return
+
+                (
+                    template,
+                    configuration,
+                ) = self._prepare_xml_generation_and_get_template()
+                for chunk in self._remove_empty_lines_from_xml_stream(
+                    template.generate(configuration)
+                ):
+                    output_file.write(chunk)
+                    stage.add_output(chunk)
+        finally:
+            self.clear_template_configuration_from_this_object()
+
+    def generate_xml_documents(self, max_document_size: int):
+        """Yields the XML of the inheriting child class split into several import documents.
+        :param max_document_size: The maximal size of a single document in bytes.
+        :type max_document_size: int
+        :returns: A generator of XML strings.
+        :rtype: Generator[str]
+
+        Only issues can be split. Hence, this method returns the whole XML as a single document by default.
+        """
+
+        yield self.generate_xml()
+
+    def _render_xml(self) -> str:
+        """Renders the XML of this object with the configured renderer.
+        The "jinja" renderer renders the templates, "lxml" writes the same XML directly with `OjsXmlWriter`.
+        """
+
+        if self.renderer == self.RENDERER_LXML:
+            from ojs.xmlwriter import OjsXmlWriter
+
+            xml_output = io.BytesIO()
+            OjsXmlWriter(self._prepare_render_context()).write(
+                xml_output, self.template_file_name
+            )
+            return xml_output.getvalue().decode("utf-8")
+
+        template, configuration = self._prepare_xml_generation_and_get_template()
+        return template.render(configuration)
+
+    def _prettify_xml(self, xml_string):
+        """Formats the rendered XML string with the configured pretty printer.
+        The "minidom" printer builds a full DOM in Python, "lxml" formats the XML in C and
+        "none" keeps the indentation of the templates without parsing the XML again.
+        """
+
+        if self.pretty_printer == self.PRETTY_PRINTER_NONE:
+            return xml_string
+        elif self.pretty_printer == self.PRETTY_PRINTER_LXML:
+            from lxml import etree
+
+            xml_parser = etree.XMLParser(remove_blank_text=True, huge_tree=True)
+            xml_root = etree.fromstring(xml_string.encode("utf-8"), xml_parser)
+            return etree.tostring(
+                xml_root, encoding="utf-8", xml_declaration=True, pretty_print=True
+            ).decode("utf-8")
+        else:
+            import xml.dom.minidom
+
+            return xml.dom.minidom.parseString(xml_string).toprettyxml()
 
     def _remove_empty_lines_from_xml(self, xml_string):
         return "\n".join([line for line in xml_string.split("\n") if line.strip()])
 
+    def _remove_empty_lines_from_xml_stream(self, xml_chunks):
+        """Does the same as `_remove_empty_lines_from_xml`_, but on an iterable of string chunks.
+        Only leading whitespace of a line is held back, until it is clear whether the line contains any content.
+        """
+
+        leading_whitespace = []
+        line_has_content = False
+        pending_line_break = False
+
+        for chunk in xml_chunks:
+            lines = chunk.split("\n")
+            for line_number, line in enumerate(lines):
+                if line_number > 0:
+                    # A line break was passed
+                    if line_has_content:
+                        pending_line_break = True
+                    leading_whitespace.clear()
+                    line_has_content = False
+
+                if not line:
+                    continue
+
+                if line_has_content:
+                    yield line
+                elif line.strip():
+                    if pending_line_break:
+                        leading_whitespace.insert(0, "\n")
+                        pending_line_break = False
+                    leading_whitespace.append(line)
+                    yield "".join(leading_whitespace)
+                    leading_whitespace.clear()
+                    line_has_content = True
+                else:
+                    leading_whitespace.append(line)
+
+
+LocalizedArticleFields = namedtuple(
+    "LocalizedArticleFields", ["title", "prefix", "subtitle", "abstract"]
+)
+
 
 class OjsArticle(XmlGenerator):
     """A representation of an OJS article."""
 
-    PREFIX_WORDS_DE = {"der", "die", "das", "ein", "eine", "eines", "zu", "zur", "zum"}
-    PREFIX_WORDS_EN = {"a", "an", "the", "on"}
-    PREFIX_WORDS = PREFIX_WORDS_DE.union(PREFIX_WORDS_EN)
     ARTICLES_TEMPLATE_FILE_NAME = "article.xml"
     PRE_OJS_3_2_ARTICLE_TEMPLATE_FILE_NAME = "article_pre_ojs_3_2.xml"
     ARTICLES_STRING = "article"
-    LANGUAGE_ARRAY_NAME_IN_CONFIGURATION = "languages"
+
+    LOCALIZED_FIELDS = LocalizedArticleFields
 
     def __init__(self, vl_article: Article, template_configuration):
         super().__init__(template_configuration)
@@ -179,7 +582,6 @@ class OjsArticle(XmlGenerator):
         assert isinstance(vl_article, Article)
 
         self.abstract = None
-        self._authors = vl_article.authors
         self.doi = vl_article.doi
         self.id = vl_article.id
         self.keywords = []
@@ -188,50 +590,30 @@ class OjsArticle(XmlGenerator):
         self.submission_files = vl_article.files
         self.title = normalize_language_keys_in_dictionary(vl_article.title)
         self.subtitle = normalize_language_keys_in_dictionary(vl_article.subtitle)
-        self.language = normalize_to_iso_language(
-            self._get_primary_language(vl_article.languages)
-        )
-        self.prefix = self._get_title_prefix(self.title)
+        self.language = self.get_language_of_vl_article(vl_article)
+        self.prefix, self.title = self._split_title_prefix(self.title)
         self.submission_date = self._get_submission_date_from_files(vl_article.files)
         self.is_standalone = vl_article.is_standalone
 
-        self.title = self._update_title_with_prefix(self.title, self.prefix)
-
         self._submission_ids = {}
         self._submission_counter = 0
         self._author_ids = defaultdict(int)
         self._author_id_counter = 0
+        self.authors = self._create_authors(vl_article.authors)
 
         self.add_variable_to_template_configuration(self.ARTICLES_STRING, self)
+        self.languages = merge_languages(self.languages, [self.language])
 
-        if (
-            self.language
-            not in self.template_configuration[
-                self.LANGUAGE_ARRAY_NAME_IN_CONFIGURATION
-            ]
-        ):
-            # This makes sure that if the article has a non-configured language, the specific local data are still
-            # given, because otherwise OJS will complain at import!
-            if self.language is not None:
-                logger.debug("Adding language: {}".format(self.language))
-                self.template_configuration[
-                    self.LANGUAGE_ARRAY_NAME_IN_CONFIGURATION
-                ].append(self.language)
+        for language in self.languages:
+            self.get_localized_fields(language)
 
-    @property
-    def authors(self) -> list:
-        OjsAuthor = namedtuple(
-            "OjsAuthor", ["given_name", "family_name", "title", "id"]
+    @classmethod
+    def get_language_of_vl_article(cls, vl_article: Article) -> (str, None):
+        """Returns the ISO language the given article is converted with, without converting the article."""
+
+        return normalize_to_iso_language(
+            cls._get_primary_language(vl_article.languages)
         )
-        return [
-            OjsAuthor(
-                author.given_name,
-                author.family_name,
-                author.title,
-                self._get_author_pseudo_id(author),
-            )
-            for author in self._authors
-        ]
 
     @property
     def template_file_name(self) -> str:
@@ -247,6 +629,20 @@ class OjsArticle(XmlGenerator):
             ojs_issue = self._convert_to_issue()
             return ojs_issue.generate_xml()
 
+    def generate_xml_to(self, output_file):
+        if not self.is_standalone:
+            super().generate_xml_to(output_file)
+        else:
+            ojs_issue = self._convert_to_issue()
+            ojs_issue.generate_xml_to(output_file)
+
+    def generate_xml_documents(self, max_document_size: int):
+        if not self.is_standalone:
+            yield from super().generate_xml_documents(max_document_size)
+        else:
+            ojs_issue = self._convert_to_issue()
+            yield from ojs_issue.generate_xml_documents(max_document_size)
+
     def get_submission_id_for_file(self, file):
         """Generates a unique submission ID for any given submission of this article.
         :param file: A file that needs a submission ID.
@@ -272,6 +668,8 @@ class OjsArticle(XmlGenerator):
         ojs_issue.id = self.id
         ojs_issue.volume_number = self.id
         ojs_issue.issue_number = self.id
+        ojs_issue.instrumentation = self.instrumentation
+        ojs_issue.languages = self.languages
 
         if isinstance(self.title, dict):
             issue_title = {}
@@ -295,29 +693,60 @@ class OjsArticle(XmlGenerator):
         ojs_issue.publication_year = self.publication_year
         ojs_issue.articles.append(self)
 
+        for variable_name, variable_value in self._temporary_configurations.items():
+            if variable_name != self.ARTICLES_STRING:
+                ojs_issue.add_variable_to_template_configuration(
+                    variable_name, variable_value
+                )
+
         return ojs_issue
 
-    def _get_prefix_from_title(self, title: str) -> (str, None):
-        prefix_words = []
-        for word in title.split(" "):
-            if word.lower() in self.PREFIX_WORDS:
-                prefix_words.append(word)
-            else:
-                break
+    def _get_title_prefix_pattern(self, language):
+        """Returns the compiled prefix words of the given locale. Titles of a locale without prefix words
+        and titles without a locale are matched against the prefix words of all locales.
+        """
 
-        if prefix_words:
-            return " ".join(prefix_words)
-        else:
-            return None
+        configured_prefix_words = (
+            self.template_configuration.get(Configurator.KEYWORD_TITLE_PREFIXES) or {}
+        )
+        if not isinstance(configured_prefix_words, dict):
+            raise ValueError(
+                'The "{title_prefixes}" have to map locales to lists of words, e.g. {{"fr_FR": ["le", "la"]}}!'.format(
+                    title_prefixes=Configurator.KEYWORD_TITLE_PREFIXES
+                )
+            )
+
+        prefix_words = configured_prefix_words.get(
+            language, TITLE_PREFIX_WORDS.get(language)
+        )
+        if prefix_words is None:
+            prefix_words = itertools.chain(
+                *TITLE_PREFIX_WORDS.values(), *configured_prefix_words.values()
+            )
+
+        return compile_title_prefix_pattern(
+            frozenset(prefix_word.lower() for prefix_word in prefix_words)
+        )
+
+    def _split_title_prefix_of_language(self, title: str, language) -> tuple:
+        """Returns the prefix of the given title in the given locale (None, if it has none) and the rest of the title."""
+
+        prefix_match = self._get_title_prefix_pattern(language).match(title)
+        if prefix_match is None:
+            return None, title
+
+        return prefix_match.group()[:-1], title[prefix_match.end() :]
 
-    def _get_primary_language(self, languages) -> (str, None):
+    @staticmethod
+    def _get_primary_language(languages) -> (str, None):
         """Returns the first language given."""
 
         if languages:
             if isinstance(languages, list):
                 return languages[0]
             elif isinstance(languages, set):
-                return languages.pop()
+                # The set of the Visual Library article must not be changed, the article may be converted again
+                return next(iter(languages))
 
         return None
 
@@ -328,16 +757,46 @@ class OjsArticle(XmlGenerator):
 
         return datetime.today()
 
-    def _get_title_prefix(self, article_title: (str, dict)) -> (str, dict, None):
-        """Estimates the prefix of the article's title."""
+    def _split_title_prefix(self, article_title: (str, dict)) -> tuple:
+        """Splits the prefix off the article's title with the prefix words of the title's locale.
+        :returns: The prefix and the title without it, both as dictionaries with the languages as keys,
+        if the title is given per language. A title without language is split in the article's language.
+        :rtype: tuple
+        """
 
         if isinstance(article_title, dict):
-            return {
-                language: self._get_title_prefix(title_string)
-                for language, title_string in article_title.items()
-            }
+            prefixes = {}
+            titles = {}
+            for language, title_string in article_title.items():
+                (
+                    prefixes[language],
+                    titles[language],
+                ) = self._split_title_prefix_of_language(title_string, language)
+
+            return prefixes, titles
+        elif article_title is not None:
+            return self._split_title_prefix_of_language(article_title, self.language)
         else:
-            return self._get_prefix_from_title(article_title)
+            return None, article_title
+
+    def _create_authors(self, vl_authors) -> tuple:
+        """Creates the authors as rendered in the templates: every author gets a pseudo ID, authors without
+        a given name are replaced by a dummy author and an article without any author gets the dummy author.
+        """
+
+        authors = tuple(
+            normalize_user_name(
+                OjsAuthor(
+                    author.given_name,
+                    author.family_name,
+                    author.title,
+                    self._get_author_pseudo_id(author),
+                )
+            )
+            for author in vl_authors
+        )
+
+        return authors if authors else (DUMMY_AUTHOR,)
 
     def _get_author_pseudo_id(self, author) -> int:
         author_id = self._author_ids[author]
@@ -348,32 +807,11 @@ class OjsArticle(XmlGenerator):
 
         return author_id
 
-    def _update_title_with_prefix(self, title, prefix):
-        if not prefix or prefix is None:
-            return title
-
-        def get_title_shortened_by_prefix_length(title, prefix):
-            return title[len(prefix) + 1 :]
-
-        if isinstance(title, dict):
-            updated_dict = {}
-            for language, title_string in title.items():
-                if prefix[language] is not None and title_string.startswith(
-                    prefix[language]
-                ):
-                    updated_dict[language] = get_title_shortened_by_prefix_length(
-                        title_string, prefix[language]
-                    )
-                else:
-                    updated_dict[language] = title_string
 
-            return updated_dict
-        else:
-            return (
-                get_title_shortened_by_prefix_length(title, prefix)
-                if title.startswith(prefix)
-                else title
-            )
+LocalizedIssueFields = namedtuple("LocalizedIssueFields", ["title"])
+IssueGalley = namedtuple(
+    "IssueGalley", ["file", "label", "date_uploaded", "date_modified"]
+)
 
 
 class OjsIssue(XmlGenerator):
@@ -381,6 +819,7 @@ class OjsIssue(XmlGenerator):
 
     ISSUE_STRING = Issue.ISSUE_STRING
     ISSUES_STRING = "issues"
+    ISSUE_TEMPLATE_FILE_NAME = "issue.xml"
     ISSUES_TEMPLATE_FILE_NAME = "issues.xml"
     MODS_TAG_DETAIL_STRING = VisualLibraryExportElement.MODS_TAG_DETAIL_STRING
     MODS_TAG_NUMBER_STRING = VisualLibraryExportElement.MODS_TAG_NUMBER_STRING
@@ -388,11 +827,15 @@ class OjsIssue(XmlGenerator):
     TYPE_STRING = VisualLibraryExportElement.TYPE_STRING
     VOLUME_STRING = Volume.VOLUME_STRING
 
+    LOCALIZED_FIELDS = LocalizedIssueFields
+    # The ISO date of each attribute is kept in "iso_<attribute name>"
+    ISO_DATE_ATTRIBUTE_NAMES = ("date_published", "date_modified")
+    ISO_DATE_ATTRIBUTE_PREFIX = "iso_"
+    FILES_ATTRIBUTE_NAME = "files"
+
     def __init__(self, vl_issue: Issue = None, template_configuration=None):
         if vl_issue is not None:
-            logger.debug(
-                "Using object ID {id} for generating a OjsIssue".format(id=vl_issue.id)
-            )
+            logger.debug("Using object ID %s for generating a OjsIssue", vl_issue.id)
         else:
             logger.debug("Creating empty Issue object!")
 
@@ -416,10 +859,11 @@ class OjsIssue(XmlGenerator):
             # This is a shortcut! Resolving a parent would take longer!
             volume_number = self._get_volume_number(vl_issue)
 
-            self.articles = [
-                OjsArticle(article, template_configuration)
-                for article in vl_issue.articles
-            ]
+            self.articles = LazyOjsObjectList(
+                vl_issue.articles,
+                lambda vl_article: OjsArticle(vl_article, template_configuration),
+            )
+            self.add_languages_of_vl_articles(vl_issue.articles)
             volume_number = (
                 volume_number if volume_number is not None else vl_issue.parent.number
             )
@@ -440,10 +884,43 @@ class OjsIssue(XmlGenerator):
 
             self.teaser_image_file = vl_issue.teaser_image_file
 
+        for language in self.languages:
+            self.get_localized_fields(language)
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+
+        # The views used by the templates are computed again, whenever one of their attributes is set
+        if name in self.ISO_DATE_ATTRIBUTE_NAMES:
+            super().__setattr__(
+                self.ISO_DATE_ATTRIBUTE_PREFIX + name,
+                extract_isodate_from_datetime(value),
+            )
+        elif name == self.FILES_ATTRIBUTE_NAME:
+            super().__setattr__("galleys", self._get_galleys(value))
+
     @property
     def template_file_name(self) -> str:
         return self.ISSUES_TEMPLATE_FILE_NAME
 
+    def generate_xml_documents(self, max_document_size: int):
+        splitter = IssuesXmlDocumentSplitter(self, max_document_size)
+        yield from splitter.generate_xml_documents([self])
+
+    @staticmethod
+    def _get_galleys(files) -> list:
+        """Returns the issue galleys of the given files with their label and ISO dates."""
+
+        return [
+            IssueGalley(
+                file,
+                get_name_for_mime_type(file.mime_type),
+                extract_isodate_from_datetime(file.date_uploaded),
+                extract_isodate_from_datetime(file.date_modified),
+            )
+            for file in files or []
+        ]
+
     def _get_volume_number(self, vl_issue: Issue) -> (str, None):
         try:
             info_node = vl_issue.metadata.find(self.MODS_TAG_PART_STRING).find(
@@ -456,23 +933,35 @@ class OjsIssue(XmlGenerator):
 
 
 class OjsVolume(XmlGenerator):
-    """A representation of a Volume in OJS."""
+    """A representation of a Volume in OJS.
+    A volume without issues is rendered as the issue itself, hence it provides the title of an issue.
+    """
+
+    LOCALIZED_FIELDS = LocalizedIssueFields
 
     def __init__(self, vl_volume: Volume, template_configuration):
         super(OjsVolume, self).__init__(template_configuration)
 
         assert isinstance(vl_volume, Volume)
 
+        self.id = vl_volume.id
         self.volume_number = remove_letters_from_alphanumeric_string(vl_volume.number)
         self.publication_year = vl_volume.publication_date
 
-        self.issues = [
-            OjsIssue(issue, template_configuration) for issue in vl_volume.issues
-        ]
-        self.articles = [
-            OjsArticle(article, template_configuration)
-            for article in vl_volume.articles
-        ]
+        self.issues = LazyOjsObjectList(
+            vl_volume.issues,
+            lambda vl_issue: OjsIssue(vl_issue, template_configuration),
+        )
+        self.articles = LazyOjsObjectList(
+            vl_volume.articles,
+            lambda vl_article: OjsArticle(vl_article, template_configuration),
+        )
+        self.add_languages_of_vl_articles(
+            itertools.chain(
+                *(vl_issue.articles for vl_issue in vl_volume.issues),
+                vl_volume.articles,
+            )
+        )
 
         if vl_volume.title is not None:
             self.title = normalize_language_keys_in_dictionary(
@@ -486,15 +975,226 @@ class OjsVolume(XmlGenerator):
     def template_file_name(self):
         return OjsIssue.ISSUES_TEMPLATE_FILE_NAME
 
+    def generate_xml_documents(self, max_document_size: int):
+        splitter = IssuesXmlDocumentSplitter(self, max_document_size)
+        yield from splitter.generate_xml_documents(
+            self.issues if self.issues else [self]
+        )
+
+
+class IssuesXmlDocumentSplitter:
+    """Writes issues into a sequence of valid <issues> documents, each staying below a maximal size.
+
+    The issues are split at issue boundaries whenever possible. If a single issue does not fit into a document,
+    its articles are distributed over several documents, each containing a copy of the issue with a part of
+    the articles. OJS appends the articles of such a repeated issue to the already imported one.
+    Only the first copy embeds the cover and the issue galleys, so they count against a single document.
+    At most one document and one issue that fits into a document are held in memory.
+
+    The documents keep the indentation of the templates and are not pretty-printed, because the pretty printing
+    would change the size of the documents.
+    """
+
+    ISSUES_CLOSING_TAG = "</issues>"
+    ARTICLES_CLOSING_TAG = "</articles>"
+
+    def __init__(self, xml_generator: XmlGenerator, max_document_size: int):
+        self.xml_generator = xml_generator
+        self.max_document_size = max_document_size
+
+        self._configuration = None
+        self._document_head = None
+        self._document_tail = None
+        self._document_parts = []
+        self._document_size = 0
+
+    def generate_xml_documents(self, issues):
+        """Yields the XML documents for the given issues."""
+
+        preparation = self.xml_generator._prepare_xml_generation_and_get_template()
+        template, self._configuration = preparation
+        try:
+            self._document_head, self._document_tail = self._render_split_at(
+                template,
+                self.ISSUES_CLOSING_TAG,
+                issues=[],
+                root_every_issue_in_issues_tag=False,
+            )
+            self._start_new_document()
+
+            for issue in issues:
+                yield from self._add_issue(issue)
+
+            if self._document_parts:
+                yield self._finish_document()
+        finally:
+            self.xml_generator.clear_template_configuration_from_this_object()
+
+    def _add_issue(self, issue):
+        issue_head, issue_tail = self._render_issue_shell(issue)
+        issue_shell_size = sum(map(self._get_size, (issue_head, issue_tail)))
+
+        article_fragments = []
+        issue_size = issue_shell_size
+        articles = iter(issue.articles)
+
+        # Collect the articles as long as the whole issue may fit into a single document
+        for article_sequence, article in enumerate(articles):
+            article_fragment = self._render_article(issue, article, article_sequence)
+            article_fragments.append(article_fragment)
+            issue_size += self._get_size(article_fragment)
+
+            if self._get_empty_document_size() + issue_size > self.max_document_size:
+                break
+        else:
+            if self._exceeds_document(issue_size):
+                yield from self._flush_document()
+
+            self._add_issue_part(issue_head, article_fragments, issue_tail, issue_size)
+            return
+
+        logger.info(
+            "Issue %s does not fit into a single document, splitting it by articles",
+            issue.id,
+        )
+
+        remaining_article_fragments = (
+            self._render_article(issue, article, article_sequence)
+            for article_sequence, article in enumerate(
+                articles, start=len(article_fragments)
+            )
+        )
+
+        yield from self._flush_document()
+        part_fragments = []
+        part_size = issue_shell_size
+        for article_fragment in itertools.chain(
+            article_fragments, remaining_article_fragments
+        ):
+            article_fragment_size = self._get_size(article_fragment)
+
+            if part_fragments and self._exceeds_document(
+                part_size + article_fragment_size
+            ):
+                self._add_issue_part(issue_head, part_fragments, issue_tail, part_size)
+                yield from self._flush_document()
+
+                # The cover and the issue galleys are imported with the first part only
+                issue_head, issue_tail = self._render_issue_shell(
+                    issue, embed_files=False
+                )
+                issue_shell_size = sum(map(self._get_size, (issue_head, issue_tail)))
+                part_fragments = []
+                part_size = issue_shell_size
+
+            if not part_fragments and self._exceeds_document(
+                part_size + article_fragment_size
+            ):
+                logger.warning(
+                    "A single article of issue %s exceeds the maximal document size of %d bytes!",
+                    issue.id,
+                    self.max_document_size,
+                )
+
+            part_fragments.append(article_fragment)
+            part_size += article_fragment_size
+
+        self._add_issue_part(issue_head, part_fragments, issue_tail, part_size)
+
+    def _exceeds_document(self, size: int) -> bool:
+        """Returns True, if the given number of bytes does not fit into the current document anymore."""
+        return self._document_size + size > self.max_document_size
+
+    def _add_issue_part(self, issue_head, article_fragments, issue_tail, size):
+        self._document_parts.append(issue_head)
+        self._document_parts.extend(article_fragments)
+        self._document_parts.append(issue_tail)
+        self._document_size += size
+
+    def _flush_document(self):
+        if self._document_parts:
+            yield self._finish_document()
+
+    def _finish_document(self) -> str:
+        document = "\n".join(
+            [self._document_head] + self._document_parts + [self._document_tail]
+        )
+        self._start_new_document()
+        return document
+
+    def _start_new_document(self):
+        self._document_parts = []
+        self._document_size = self._get_empty_document_size()
+
+    def _get_empty_document_size(self) -> int:
+        return self._get_size(self._document_head) + self._get_size(self._document_tail)
+
+    def _render_issue_shell(self, issue, embed_files=True):
+        """Renders the issue without its articles and splits it where the articles belong.
+        Without `embed_files`, the cover and the issue galleys are left out, e.g. for the repeated parts of an issue.
+        """
+
+        issue_shell = copy.copy(issue)
+        issue_shell.articles = []
+        if not embed_files:
+            issue_shell.teaser_image_file = None
+            issue_shell.files = None
+
+        template = self.xml_generator.template_environment.get_template(
+            OjsIssue.ISSUE_TEMPLATE_FILE_NAME
+        )
+        return self._render_split_at(
+            template, self.ARTICLES_CLOSING_TAG, issue=issue_shell
+        )
+
+    def _render_article(self, issue, article, article_sequence) -> str:
+        template = self.xml_generator.template_environment.get_template(
+            article.template_file_name
+        )
+        return self._render(
+            template,
+            issue=issue,
+            article=article,
+            article_sequence=article_sequence,
+        )
+
+    def _render_split_at(self, template, closing_tag, **variables):
+        """Renders the given template and splits the result in front of the last given closing tag."""
+
+        xml_string = self._render(template, **variables)
+        split_index = xml_string.rindex(closing_tag)
+        return xml_string[:split_index].rstrip(), xml_string[split_index:]
+
+    def _render(self, template, **variables) -> str:
+        configuration = dict(self._configuration, **variables)
+        return self.xml_generator._remove_empty_lines_from_xml(
+            template.render(configuration)
+        )
+
+    @staticmethod
+    def _get_size(xml_string) -> int:
+        # Every fragment is joined with a line break
+        return len(xml_string.encode("utf-8")) + 1
+
 
 class OjsXmlGenerator:
     """A factory object that generates XML generating objects."""
 
-    def __init__(self, xml_configuration_data):
+    def __init__(self, xml_configuration_data, instrumentation: Instrumentation = None):
+        """
+        :param xml_configuration_data: The parsed configuration.
+        :type xml_configuration_data: Configurator
+        :param instrumentation: Measures the construction of the OJS objects and is passed on to them.
+        :type instrumentation: Instrumentation
+        """
+
         self.xml_configuration = xml_configuration_data
         self.template_configuration = (
             xml_configuration_data.get_template_configuration()
         )
+        self.instrumentation = (
+            instrumentation if instrumentation is not None else NO_INSTRUMENTATION
+        )
 
     def convert_article_object_to_ojs_object(self, article: Article) -> OjsArticle:
         return OjsArticle(article, self.template_configuration)
@@ -516,11 +1216,18 @@ class OjsXmlGenerator:
 
         if isinstance(vl_object, Journal):
             raise TypeError(
-                "Cannot convert Journal object to OJS Object! Parse issues separately instead!"
+                "Cannot convert Journal object to OJS Object! Use a JournalExporter instead!"
             )
-        elif isinstance(vl_object, Issue):
-            return self.convert_issue_object_to_ojs_object(vl_object)
-        elif isinstance(vl_object, Volume):
-            return self.convert_volume_object_to_ojs_object(vl_object)
-        elif isinstance(vl_object, Article):
-            return self.convert_article_object_to_ojs_object(vl_object)
+
+        with self.instrumentation.measure(STAGE_CONSTRUCTION, vl_object):
+            if isinstance(vl_object, Issue):
+                ojs_object = self.convert_issue_object_to_ojs_object(vl_object)
+            elif isinstance(vl_object, Volume):
+                ojs_object = self.convert_volume_object_to_ojs_object(vl_object)
+            elif isinstance(vl_object, Article):
+                ojs_object = self.convert_article_object_to_ojs_object(vl_object)
+            else:
+                return None
+
+        ojs_object.instrumentation = self.instrumentation
+        return ojs_object
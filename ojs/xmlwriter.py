@@ -0,0 +1,640 @@
+import codecs
+
+from lxml import etree
+
+from templates.template_functions import (
+    FILE_DATA_SOURCE_VARIABLE_NAME,
+    FILE_EMBEDDING_INLINE,
+    FILE_EMBEDDING_VARIABLE_NAME,
+    FILE_STORE_VARIABLE_NAME,
+    extract_isodate_from_datetime,
+    get_file_reference,
+    get_name_for_mime_type,
+    get_value_for_language,
+    iterate_base64_encoded_data,
+)
+
+PKP_NAMESPACE = "http://pkp.sfu.ca"
+XSI_NAMESPACE = "http://www.w3.org/2001/XMLSchema-instance"
+SCHEMA_LOCATION_ATTRIBUTE = "{{{namespace}}}schemaLocation".format(
+    namespace=XSI_NAMESPACE
+)
+SCHEMA_LOCATION = "http://pkp.sfu.ca native.xsd"
+# The declaration of the templates. Without an encoding, the decoded XML string can still be parsed by lxml.
+XML_DECLARATION = b'<?xml version="1.0" ?>\n'
+
+PKP_NAMESPACE_MAP = {None: PKP_NAMESPACE, "xsi": XSI_NAMESPACE}
+XSI_NAMESPACE_MAP = {"xsi": XSI_NAMESPACE}
+
+
+def to_text(value) -> str:
+    """Converts a value to text the same way the templates do."""
+
+    return str(value)
+
+
+class TextOutputAdapter:
+    """Lets `etree.xmlfile` write its UTF-8 encoded bytes into a text file-like object."""
+
+    def __init__(self, output_file, on_write=None):
+        """
+        :param output_file: A text file-like object providing a `write` method.
+        :param on_write: An optional callable receiving every written text chunk, e.g. to measure the output.
+        :type on_write: Callable
+        """
+
+        self.output_file = output_file
+        self.on_write = on_write
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def write(self, data: bytes):
+        text = self._decoder.decode(data)
+        if not text:
+            return
+
+        self.output_file.write(text)
+        if self.on_write is not None:
+            self.on_write(text)
+
+
+class OjsXmlWriter:
+    """Writes the OJS native XML of OJS objects directly with `lxml.etree.xmlfile` instead of rendering the templates.
+
+    Every method mirrors the template of the same name and takes its variables from the same render context.
+    The XML is written incrementally and the files are encoded into the `embed` elements chunk by chunk,
+    hence neither the XML nor a file is ever held in memory as a whole.
+    Custom templates are not supported by this writer.
+    """
+
+    def __init__(self, configuration):
+        """
+        :param configuration: The render context of the document, as handed to the templates.
+        :type configuration: Mapping
+        """
+
+        self.configuration = configuration
+        self.languages = configuration.get("languages") or ()
+        self.use_pre_3_2_schema = configuration.get("use_pre_3_2_schema", False)
+
+        self._writers = {
+            "issues.xml": self._write_issues_document,
+            "article.xml": self._write_article_document,
+            "article_pre_ojs_3_2.xml": self._write_article_document,
+        }
+
+    def write(self, output_file, template_file_name: str):
+        """Writes the document of the given template into the given binary file-like object.
+        :param output_file: A file-like object providing a `write` method for bytes.
+        :param template_file_name: The template the written document replaces, e.g. "issues.xml".
+        :type template_file_name: str
+        """
+
+        try:
+            write_document = self._writers[template_file_name]
+        except KeyError:
+            raise ValueError(
+                'The template "{template}" cannot be written with lxml! Use the Jinja renderer instead.'.format(
+                    template=template_file_name
+                )
+            )
+
+        if template_file_name == "issues.xml":
+            output_file.write(XML_DECLARATION)
+
+        with etree.xmlfile(output_file, encoding="utf-8") as xml_file:
+            write_document(xml_file)
+
+    def _write_issues_document(self, xml_file):
+        issues = self.configuration.get("issues") or []
+        if self.configuration.get("root_every_issue_in_issues_tag"):
+            with xml_file.element("root"):
+                for issue in issues:
+                    with self._element(
+                        xml_file,
+                        "issues",
+                        {SCHEMA_LOCATION_ATTRIBUTE: SCHEMA_LOCATION},
+                        PKP_NAMESPACE_MAP,
+                    ):
+                        self._write_issue(xml_file, issue)
+        else:
+            with self._element(
+                xml_file,
+                "issues",
+                {SCHEMA_LOCATION_ATTRIBUTE: SCHEMA_LOCATION},
+                PKP_NAMESPACE_MAP,
+            ):
+                for issue in issues:
+                    self._write_issue(xml_file, issue)
+
+    def _write_article_document(self, xml_file):
+        self._write_article(xml_file, self.configuration["article"], issue=None)
+
+    def _write_issue(self, xml_file, issue):
+        with self._element(
+            xml_file,
+            "issue",
+            {"published": "0", "access_status": "1"},
+            XSI_NAMESPACE_MAP,
+        ):
+            self._text_element(
+                xml_file, "id", issue.id, {"type": "internal", "advice": "ignore"}
+            )
+
+            with self._element(xml_file, "issue_identification"):
+                if getattr(issue, "volume_number", None):
+                    self._text_element(xml_file, "volume", issue.volume_number)
+                if getattr(issue, "issue_number", None):
+                    self._text_element(xml_file, "number", issue.issue_number)
+                self._text_element(xml_file, "year", issue.publication_year)
+
+                issue_title = getattr(issue, "title", None)
+                if self.configuration.get("add_title_to_issue") and issue_title:
+                    for language in self.languages:
+                        self._text_element(
+                            xml_file,
+                            "title",
+                            issue.get_localized_fields(language).title,
+                            {"locale": language},
+                        )
+
+            if getattr(issue, "date_published", None):
+                self._text_element(
+                    xml_file,
+                    "date_published",
+                    issue.iso_date_published,
+                )
+            if getattr(issue, "date_modified", None):
+                self._text_element(
+                    xml_file,
+                    "last_modified",
+                    issue.iso_date_modified,
+                )
+
+            if self.use_pre_3_2_schema:
+                self._write_sections(xml_file)
+
+            teaser_image_file = getattr(issue, "teaser_image_file", None)
+            if teaser_image_file and not self.use_pre_3_2_schema:
+                with self._element(xml_file, "covers"):
+                    with self._element(xml_file, "cover"):
+                        self._text_element(
+                            xml_file,
+                            "cover_image",
+                            "cover_issue_{id}.jpg".format(id=issue.id),
+                        )
+                        with self._element(xml_file, "cover_image_alt_text"):
+                            pass
+                        self._write_embedded_file(xml_file, teaser_image_file)
+
+            # A volume without issues is written as the issue, but it has no galleys
+            issue_galleys = getattr(issue, "galleys", None)
+            if issue_galleys:
+                self._write_issue_galleys(xml_file, issue_galleys)
+
+            self._write_articles(xml_file, issue)
+
+    def _write_sections(self, xml_file):
+        article_reference_label = self.configuration.get("article_reference_label")
+        section_attributes = {
+            "ref": to_text(article_reference_label),
+            "seq": "1",
+            "editor_restricted": "0",
+            "meta_indexed": "1",
+            "meta_reviewed": "1",
+            "abstracts_not_required": "1",
+            "hide_title": "0",
+            "hide_author": "0",
+            "abstract_word_count": "0",
+        }
+
+        with self._element(xml_file, "sections"):
+            with self._element(xml_file, "section", section_attributes):
+                self._text_element(
+                    xml_file, "id", 1, {"type": "internal", "advice": "ignore"}
+                )
+                for language in self.languages:
+                    self._text_element(
+                        xml_file,
+                        "abbrev",
+                        article_reference_label,
+                        {"locale": language},
+                    )
+                for language in self.languages:
+                    self._text_element(
+                        xml_file,
+                        "title",
+                        self.configuration.get("article_text_genre_label"),
+                        {"locale": language},
+                    )
+
+    def _write_issue_galleys(self, xml_file, issue_galleys):
+        with self._element(
+            xml_file,
+            "issue_galleys",
+            {SCHEMA_LOCATION_ATTRIBUTE: SCHEMA_LOCATION},
+            XSI_NAMESPACE_MAP,
+        ):
+            for galley in issue_galleys:
+                with self._element(xml_file, "issue_galley"):
+                    self._text_element(xml_file, "label", galley.label)
+                    with self._element(xml_file, "issue_file"):
+                        self._text_element(xml_file, "file_name", galley.file.name)
+                        self._text_element(xml_file, "file_type", galley.file.mime_type)
+                        self._text_element(xml_file, "file_size", galley.file.size)
+                        self._text_element(xml_file, "content_type", 1)
+                        self._text_element(
+                            xml_file, "original_file_name", galley.file.name
+                        )
+                        self._text_element(
+                            xml_file, "date_uploaded", galley.date_uploaded
+                        )
+                        self._text_element(
+                            xml_file, "date_modified", galley.date_modified
+                        )
+                        self._write_embedded_file(xml_file, galley.file)
+
+    def _write_articles(self, xml_file, issue):
+        with self._element(
+            xml_file,
+            "articles",
+            {SCHEMA_LOCATION_ATTRIBUTE: SCHEMA_LOCATION},
+            XSI_NAMESPACE_MAP,
+        ):
+            for article_sequence, article in enumerate(issue.articles):
+                self._write_article(xml_file, article, issue, article_sequence)
+
+    def _write_article(self, xml_file, article, issue, article_sequence=None):
+        if self.use_pre_3_2_schema:
+            self._write_pre_ojs_3_2_article(xml_file, article, issue)
+        else:
+            self._write_ojs_3_2_article(xml_file, article, issue, article_sequence)
+
+    def _write_ojs_3_2_article(self, xml_file, article, issue, article_sequence):
+        article_attributes = {
+            "date_submitted": to_text(
+                extract_isodate_from_datetime(article.submission_date)
+            ),
+            "stage": "production",
+            "status": "5",
+            "submission_progress": "0",
+        }
+
+        with self._element(xml_file, "article", article_attributes, PKP_NAMESPACE_MAP):
+            self._text_element(
+                xml_file, "id", article.id, {"type": "internal", "advice": "ignore"}
+            )
+
+            for submission in article.submission_files:
+                submission_id = article.get_submission_id_for_file(submission)
+                suffix = to_text(get_name_for_mime_type(submission.mime_type)).lower()
+                file_id = self.configuration["generate_unique_file_id"]()
+
+                with self._element(
+                    xml_file,
+                    "submission_file",
+                    {
+                        "stage": "proof",
+                        "id": to_text(submission_id),
+                        SCHEMA_LOCATION_ATTRIBUTE: SCHEMA_LOCATION,
+                        "file_id": to_text(file_id),
+                        "genre": to_text(
+                            self.configuration.get("article_text_genre_label")
+                        ),
+                    },
+                    XSI_NAMESPACE_MAP,
+                ):
+                    for language in self.languages:
+                        self._text_element(
+                            xml_file,
+                            "name",
+                            "{user}, {name}.{suffix}".format(
+                                user=self.configuration.get("file_uploading_ojs_user"),
+                                name=get_value_for_language(submission.name, language),
+                                suffix=suffix,
+                            ),
+                            {"locale": language},
+                        )
+                    with self._element(
+                        xml_file,
+                        "file",
+                        {
+                            "id": to_text(file_id),
+                            "extension": suffix,
+                            "filesize": to_text(submission.size),
+                        },
+                    ):
+                        self._write_submission_file_contents(
+                            xml_file, submission, submission_id
+                        )
+
+            for language in self.languages:
+                self._write_publication(
+                    xml_file, article, issue, language, article_sequence
+                )
+
+    def _write_publication(self, xml_file, article, issue, language, article_sequence):
+        publication_attributes = {
+            "locale": language,
+            "version": "1",
+            "status": "5",
+            "seq": to_text(article_sequence if article_sequence is not None else 1),
+            "section_ref": to_text(self.configuration.get("article_reference_label")),
+            "access_status": "0",
+            SCHEMA_LOCATION_ATTRIBUTE: SCHEMA_LOCATION,
+        }
+        date_published = self._get_date_published(article, issue)
+        if date_published is not None:
+            publication_attributes["date_published"] = to_text(date_published)
+
+        localized_fields = article.get_localized_fields(language)
+
+        with self._element(
+            xml_file, "publication", publication_attributes, XSI_NAMESPACE_MAP
+        ):
+            if article.doi:
+                self._text_element(
+                    xml_file, "id", article.doi, {"type": "doi", "advice": "update"}
+                )
+
+            self._text_element(
+                xml_file, "title", localized_fields.title, {"locale": language}
+            )
+            if localized_fields.prefix:
+                self._text_element(
+                    xml_file, "prefix", localized_fields.prefix, {"locale": language}
+                )
+            if localized_fields.subtitle:
+                self._text_element(
+                    xml_file,
+                    "subtitle",
+                    localized_fields.subtitle,
+                    {"locale": language},
+                )
+            if localized_fields.abstract:
+                self._text_element(
+                    xml_file,
+                    "abstract",
+                    localized_fields.abstract,
+                    {"locale": language},
+                )
+
+            self._text_element(xml_file, "type", "text", {"locale": language})
+
+            if article.keywords:
+                self._write_keywords(xml_file, article.keywords, language)
+
+            self._write_authors(xml_file, article.authors)
+
+            for seq, submission in enumerate(article.submission_files):
+                submission_id = article.get_submission_id_for_file(submission)
+                with self._element(
+                    xml_file,
+                    "article_galley",
+                    {
+                        "approved": "false",
+                        SCHEMA_LOCATION_ATTRIBUTE: SCHEMA_LOCATION,
+                        "locale": language,
+                    },
+                    XSI_NAMESPACE_MAP,
+                ):
+                    self._text_element(
+                        xml_file,
+                        "name",
+                        get_name_for_mime_type(submission.mime_type),
+                        {"locale": language},
+                    )
+                    self._text_element(xml_file, "seq", seq)
+                    with self._element(
+                        xml_file, "submission_file_ref", {"id": to_text(submission_id)}
+                    ):
+                        pass
+
+            self._write_pages(xml_file, article)
+
+    def _write_pre_ojs_3_2_article(self, xml_file, article, issue):
+        article_attributes = {}
+        if article.language:
+            article_attributes["locale"] = to_text(article.language)
+        article_attributes.update(
+            {
+                "section_ref": to_text(
+                    self.configuration.get("article_reference_label")
+                ),
+                SCHEMA_LOCATION_ATTRIBUTE: SCHEMA_LOCATION,
+                "stage": "production",
+            }
+        )
+        date_published = self._get_date_published(article, issue)
+        if date_published is not None:
+            article_attributes["date_published"] = to_text(date_published)
+
+        with self._element(xml_file, "article", article_attributes, PKP_NAMESPACE_MAP):
+            self._text_element(
+                xml_file, "id", article.id, {"type": "internal", "advice": "ignore"}
+            )
+            if article.doi:
+                self._text_element(
+                    xml_file, "id", article.doi, {"type": "doi", "advice": "update"}
+                )
+
+            for language in self.languages:
+                self._text_element(
+                    xml_file,
+                    "title",
+                    article.get_localized_fields(language).title,
+                    {"locale": language},
+                )
+
+            for field_name in ("prefix", "subtitle"):
+                if not getattr(article, field_name):
+                    continue
+
+                for language in self.languages:
+                    value = getattr(article.get_localized_fields(language), field_name)
+                    if value:
+                        self._text_element(
+                            xml_file, field_name, value, {"locale": language}
+                        )
+
+            # The template checks the variable "abstract" of the render context, not of the article
+            if self.configuration.get("abstract"):
+                for language in self.languages:
+                    self._text_element(
+                        xml_file,
+                        "abstract",
+                        article.get_localized_fields(language).abstract,
+                        {"locale": language},
+                    )
+
+            if article.keywords:
+                for language in self.languages:
+                    self._write_keywords(xml_file, article.keywords, language)
+
+            self._write_authors(xml_file, article.authors)
+
+            for seq, submission in enumerate(article.submission_files):
+                self._write_pre_ojs_3_2_submission(xml_file, article, submission, seq)
+
+            self._write_pages(xml_file, article)
+
+    def _write_pre_ojs_3_2_submission(self, xml_file, article, submission, seq):
+        revision_number = 1
+        submission_id = article.get_submission_id_for_file(submission)
+
+        with self._element(
+            xml_file,
+            "submission_file",
+            {
+                "stage": "proof",
+                "id": to_text(submission_id),
+                SCHEMA_LOCATION_ATTRIBUTE: SCHEMA_LOCATION,
+            },
+            XSI_NAMESPACE_MAP,
+        ):
+            revision_attributes = {
+                "number": to_text(revision_number),
+                "filename": to_text(submission.name),
+                "viewable": "false",
+                "date_uploaded": to_text(
+                    extract_isodate_from_datetime(submission.date_uploaded)
+                ),
+                "date_modified": to_text(
+                    extract_isodate_from_datetime(submission.date_modified)
+                ),
+                "filesize": to_text(submission.size),
+                "filetype": to_text(submission.mime_type),
+                "uploader": to_text(self.configuration.get("file_uploading_ojs_user")),
+                "genre": to_text(self.configuration.get("article_text_genre_label")),
+            }
+            with self._element(xml_file, "revision", revision_attributes):
+                for language in self.languages:
+                    self._text_element(
+                        xml_file,
+                        "name",
+                        get_value_for_language(submission.name, language),
+                        {"locale": language},
+                    )
+                self._write_submission_file_contents(
+                    xml_file, submission, submission_id
+                )
+
+        with self._element(
+            xml_file,
+            "article_galley",
+            {"approved": "false", SCHEMA_LOCATION_ATTRIBUTE: SCHEMA_LOCATION},
+            XSI_NAMESPACE_MAP,
+        ):
+            name_attributes = {}
+            if article.language:
+                name_attributes["locale"] = to_text(article.language)
+            self._text_element(
+                xml_file,
+                "name",
+                get_name_for_mime_type(submission.mime_type),
+                name_attributes,
+            )
+            self._text_element(xml_file, "seq", seq)
+            with self._element(
+                xml_file,
+                "submission_file_ref",
+                {"id": to_text(submission_id), "revision": to_text(revision_number)},
+            ):
+                pass
+
+    def _write_keywords(self, xml_file, keywords, language):
+        with self._element(xml_file, "keywords", {"locale": language}):
+            for keyword in keywords:
+                self._text_element(xml_file, "keyword", keyword)
+
+    def _write_authors(self, xml_file, authors):
+        with self._element(
+            xml_file,
+            "authors",
+            {SCHEMA_LOCATION_ATTRIBUTE: SCHEMA_LOCATION},
+            XSI_NAMESPACE_MAP,
+        ):
+            for seq, author in enumerate(authors):
+                author_attributes = {
+                    "include_in_browse": "true",
+                    "user_group_ref": to_text(
+                        self.configuration.get("user_group_reference_label")
+                    ),
+                }
+                if not self.use_pre_3_2_schema:
+                    author_attributes["seq"] = to_text(seq)
+                    author_attributes["id"] = to_text(author.id)
+
+                with self._element(xml_file, "author", author_attributes):
+                    given_name = to_text(author.given_name)
+                    if author.title:
+                        given_name = "{given_name} {title}".format(
+                            given_name=given_name, title=author.title
+                        )
+                    self._text_element(xml_file, "givenname", given_name)
+                    if author.family_name:
+                        self._text_element(xml_file, "familyname", author.family_name)
+                    self._text_element(
+                        xml_file, "email", self.configuration.get("dummy_mail_address")
+                    )
+
+    def _write_pages(self, xml_file, article):
+        page_range = article.page_range
+        self._text_element(
+            xml_file,
+            "pages",
+            "{start}-{end}".format(
+                start=getattr(page_range, "start", ""),
+                end=getattr(page_range, "end", ""),
+            ),
+        )
+
+    def _write_submission_file_contents(self, xml_file, file, submission_id):
+        file_reference = get_file_reference(
+            file,
+            submission_id,
+            file_embedding=self.configuration.get(FILE_EMBEDDING_VARIABLE_NAME)
+            or FILE_EMBEDDING_INLINE,
+            file_store=self.configuration.get(FILE_STORE_VARIABLE_NAME),
+            file_data_source=self.configuration.get(FILE_DATA_SOURCE_VARIABLE_NAME),
+        )
+        if file_reference is None:
+            self._write_embedded_file(xml_file, file)
+            return
+
+        with self._element(
+            xml_file,
+            "href",
+            {"src": file_reference, "mime_type": to_text(file.mime_type)},
+        ):
+            pass
+
+    def _write_embedded_file(self, xml_file, file):
+        with self._element(xml_file, "embed", {"encoding": "base64"}):
+            for chunk in iterate_base64_encoded_data(
+                file,
+                file_data_source=self.configuration.get(FILE_DATA_SOURCE_VARIABLE_NAME),
+            ):
+                xml_file.write(chunk)
+
+    @staticmethod
+    def _get_date_published(article, issue):
+        if issue and getattr(issue, "date_published", None):
+            return issue.iso_date_published
+        elif article.publication_year:
+            return extract_isodate_from_datetime(article.publication_year)
+        elif article.submission_date:
+            return extract_isodate_from_datetime(article.submission_date)
+
+        return None
+
+    @staticmethod
+    def _element(xml_file, tag, attributes=None, namespace_map=None):
+        return xml_file.element(
+            "{{{namespace}}}{tag}".format(namespace=PKP_NAMESPACE, tag=tag),
+            attributes or {},
+            nsmap=namespace_map,
+        )
+
+    def _text_element(self, xml_file, tag, text, attributes=None):
+        with self._element(xml_file, tag, attributes):
+            xml_file.write(to_text(text))
@@ -1,4 +1,6 @@
 from setuptools import setup, find_packages
 
 setup(name="vl-to-ojs-exporter", packages=find_packages(),
+      package_data={"templates": ["*.xml"], "ojs": ["xsd/*.xsd", "xsd/*/*.xsd"]},
+      entry_points={"console_scripts": ["vl-to-ojs-exporter=ojs.exporter:main"]},
       version="2.0")
@@ -1,7 +1,10 @@
+import base64
+import itertools
 import pathlib
 import re
 from collections import namedtuple
 from datetime import datetime
+from functools import lru_cache
 
 MIME_TYPE_DISPLAY_NAMES = {
     'application/pdf': 'PDF',
@@ -9,7 +12,25 @@ MIME_TYPE_DISPLAY_NAMES = {
     'application/vnd.openxmlformats-officedocument.wordprocessingml.document': 'DOCX',
 }
 
-STATIC_FILE_ID_COUNTER = 0
+# Has to be a multiple of 3, so that the base64 encoded chunks can be concatenated without padding in between.
+BASE64_CHUNK_SIZE = 3 * 256 * 1024
+DOWNLOAD_TIMEOUT_SECONDS = 60
+FILE_DATA_SOURCE_VARIABLE_NAME = 'file_data_source'
+FILE_STORE_VARIABLE_NAME = 'file_store'
+
+# How the submission files are put into the XML. Issue galleys and covers are always embedded, OJS allows nothing else.
+FILE_EMBEDDING_VARIABLE_NAME = 'file_embedding'
+FILE_EMBEDDING_EXTERNAL_DIRECTORY = 'external-dir'
+FILE_EMBEDDING_HREF = 'href'
+FILE_EMBEDDING_INLINE = 'inline'
+FILE_EMBEDDINGS = {FILE_EMBEDDING_EXTERNAL_DIRECTORY, FILE_EMBEDDING_HREF, FILE_EMBEDDING_INLINE}
+
+YEAR_PATTERN = re.compile(r'^[0-9]{4}$')
+ISO_DATE_PATTERN = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}')
+
+# The authors rendered by the templates
+OjsAuthor = namedtuple('OjsAuthor', ['given_name', 'family_name', 'title', 'id'])
+DUMMY_AUTHOR = OjsAuthor(given_name='N.', family_name='N.', title='', id='12345678')
 
 
 def extract_isodate_from_datetime(date):
@@ -19,24 +40,28 @@ def extract_isodate_from_datetime(date):
         :returns: A string of the date representation in ISO-format.
         :rtype: str
         Example: 2020-06-05 10:40:19.649000 -> 2020-06-05
+
+        The same dates are converted for every language and every article, hence the results are cached.
     """
 
-    if isinstance(date, datetime):
-        return date.date().isoformat()
-    elif isinstance(date, str):
-        if re.match(r'^[0-9]{4}$', date):
-            return datetime.strptime(date, '%Y').date().isoformat()
-        elif re.match(r'[0-9]{4}-[0-9]{2}-[0-9]{2}', date):
-            return datetime.strptime(date, '%Y-%m-%d').date().isoformat()
+    if isinstance(date, (datetime, str)):
+        return _convert_to_isodate(date)
     else:
         return date
 
 
-def generate_dummy_author():
-    # This has to be equal with
-    Author = namedtuple('Author', ['given_name', 'family_name', 'title', 'id'])
+@lru_cache(maxsize=4096)
+def _convert_to_isodate(date):
+    if isinstance(date, datetime):
+        return date.date().isoformat()
+    elif YEAR_PATTERN.match(date):
+        return datetime.strptime(date, '%Y').date().isoformat()
+    elif ISO_DATE_PATTERN.match(date):
+        return datetime.strptime(date, '%Y-%m-%d').date().isoformat()
+
 
-    return Author(given_name='N.', family_name='N.', title='', id='12345678')
+def generate_dummy_author():
+    return DUMMY_AUTHOR
 
 
 def get_value_for_language(variable, language):
@@ -78,29 +103,172 @@ def normalize_user_name(author):
         return generate_dummy_author()
 
 
-def generate_unique_file_id() -> int:
-    """Generates a unique integer."""
-    global STATIC_FILE_ID_COUNTER
-    STATIC_FILE_ID_COUNTER += 1
+class FileIdAllocator:
+    """ Generates file IDs that are unique within a single rendered document.
+
+        Every rendering gets its own allocator, so that documents can be rendered in parallel and the IDs
+        do not depend on what was rendered before. If a namespace is given (e.g. the ID of the Visual Library object),
+        it is prepended to the counter, the same way the submission IDs are built.
+    """
+
+    def __init__(self, namespace=None):
+        self.namespace = namespace
+        self._counter = itertools.count(1)
+
+    def generate_unique_file_id(self) -> int:
+        """Generates a unique integer."""
+        file_id = next(self._counter)
+
+        if self.namespace is None:
+            return file_id
+        else:
+            return int('{namespace}{file_id}'.format(namespace=self.namespace, file_id=file_id))
+
+
+def iterate_file_data(file, chunk_size=BASE64_CHUNK_SIZE):
+    """ Yields the binary content of a file chunk by chunk.
+        :param file: A file object, e.g. from the Visual Library.
+        :param chunk_size: The maximal number of bytes of a yielded chunk.
+        :type chunk_size: int
+        :returns: A generator of byte chunks.
+        :rtype: Generator[bytes]
+
+        The data is read from a local path (attribute `local_path`) if given, from already loaded data
+        (attribute `data`) or is streamed from the file's URL (attribute `url`), in this order. If none of them
+        is given, the data is taken from the file's `get_data_in_base64_encoding`.
+    """
+
+    local_path = getattr(file, 'local_path', None)
+    data = getattr(file, 'data', None)
+    url = getattr(file, 'url', None)
+
+    if local_path is not None:
+        with open(local_path, 'rb') as local_file:
+            yield from iter(lambda: local_file.read(chunk_size), b'')
+    elif data is not None:
+        data_view = memoryview(data)
+        for start in range(0, len(data_view), chunk_size):
+            yield bytes(data_view[start:start + chunk_size])
+    elif url is not None:
+        # Imported on the first download only, requests takes long to import
+        import requests
+
+        with requests.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT_SECONDS) as response:
+            response.raise_for_status()
+            yield from response.iter_content(chunk_size)
+    else:
+        yield base64.b64decode(file.get_data_in_base64_encoding())
+
 
-    return STATIC_FILE_ID_COUNTER
+def has_streamable_data(file):
+    """ Returns True, if the data of the given file can be read by `iterate_file_data`. """
 
+    return any(getattr(file, attribute, None) is not None for attribute in ('local_path', 'data', 'url'))
 
-def reset_file_id_counter() -> None:
-    global STATIC_FILE_ID_COUNTER
-    STATIC_FILE_ID_COUNTER = 0
+
+def iterate_base64_encoded_data(file, chunk_size=BASE64_CHUNK_SIZE, file_data_source=None):
+    """ Yields the base64 encoding of a file's content chunk by chunk.
+        :param file: A file object, e.g. from the Visual Library.
+        :param chunk_size: The number of bytes encoded per chunk. Has to be a multiple of 3.
+        :type chunk_size: int
+        :param file_data_source: An object providing the binary data of the file with a method
+            `iterate_data(file, chunk_size)`, e.g. a cache. If None, `iterate_file_data` is used.
+        :returns: A generator of base64 strings. Concatenated, they are equal to the base64 encoding of the whole file.
+        :rtype: Generator[str]
+
+        This way, the file never exists in memory as a single object. If the data of the file cannot be streamed,
+        the file's own `get_data_in_base64_encoding` is used as a fallback.
+    """
+
+    if file_data_source is not None:
+        data_chunks = file_data_source.iterate_data(file, chunk_size)
+    elif has_streamable_data(file):
+        data_chunks = iterate_file_data(file, chunk_size)
+    else:
+        yield file.get_data_in_base64_encoding()
+        return
+
+    remainder = b''
+    for data_chunk in data_chunks:
+        data_chunk = remainder + data_chunk
+        encodable_length = len(data_chunk) - len(data_chunk) % 3
+        remainder = data_chunk[encodable_length:]
+
+        if encodable_length:
+            yield base64.b64encode(data_chunk[:encodable_length]).decode('ascii')
+
+    if remainder:
+        yield base64.b64encode(remainder).decode('ascii')
+
+
+def iterate_base64_encoded_data_in_context(context, file):
+    """ Calls `iterate_base64_encoded_data` with the file data source given in the template context, if any. """
+
+    return iterate_base64_encoded_data(file, file_data_source=context.get(FILE_DATA_SOURCE_VARIABLE_NAME))
+
+
+def get_file_reference(file, submission_id, file_embedding=FILE_EMBEDDING_INLINE, file_store=None,
+                       file_data_source=None):
+    """ Returns the source of an `href` element referencing the given submission file instead of embedding it.
+        :param file: A file object, e.g. from the Visual Library.
+        :param submission_id: The submission ID of the file, which names the file in an external directory.
+        :param file_embedding: One of `FILE_EMBEDDINGS`.
+        :type file_embedding: str
+        :param file_store: An object storing the file with `store(file, submission_id, file_data_source)` and
+            returning its source, e.g. an ExternalFileDirectory. Only needed for `FILE_EMBEDDING_EXTERNAL_DIRECTORY`.
+        :param file_data_source: The data source the file store reads the file with.
+        :returns: The URL or path of the file. None, if the file has to be embedded.
+        :rtype: str, None
+
+        With `FILE_EMBEDDING_HREF`, the file is referenced at its URL (or its local path). Files having neither
+        of them are embedded anyway.
+    """
+
+    if file_embedding == FILE_EMBEDDING_HREF:
+        url = getattr(file, 'url', None)
+        local_path = getattr(file, 'local_path', None)
+
+        if url is not None:
+            return url
+        elif local_path is not None:
+            return str(pathlib.Path(local_path).absolute())
+        else:
+            return None
+    elif file_embedding == FILE_EMBEDDING_EXTERNAL_DIRECTORY:
+        if file_store is None:
+            raise ValueError('Files can only be stored in an external directory with a file store!')
+
+        return file_store.store(file, submission_id, file_data_source=file_data_source)
+    else:
+        return None
+
+
+def get_file_reference_in_context(context, file, submission_id):
+    """ Calls `get_file_reference` with the file embedding, file store and file data source of the template context. """
+
+    return get_file_reference(
+        file,
+        submission_id,
+        file_embedding=context.get(FILE_EMBEDDING_VARIABLE_NAME) or FILE_EMBEDDING_INLINE,
+        file_store=context.get(FILE_STORE_VARIABLE_NAME),
+        file_data_source=context.get(FILE_DATA_SOURCE_VARIABLE_NAME),
+    )
 
 
 def register_custom_filters_to_environment(environment):
     """ Registers the created methods to the Jinja environment. """
 
+    # Imported here, so that the functions can be used without loading Jinja
+    from jinja2 import pass_context
+
     environment.filters['get_file_suffix'] = get_file_suffix
     environment.filters['get_value_for_language'] = get_value_for_language
     environment.filters['get_name_for_mime_type'] = get_name_for_mime_type
     environment.filters['to_iso_date'] = extract_isodate_from_datetime
+    environment.filters['to_base64_chunks'] = pass_context(iterate_base64_encoded_data_in_context)
+    environment.filters['to_file_reference'] = pass_context(get_file_reference_in_context)
 
     environment.globals.update({
         'generate_dummy_author': generate_dummy_author,
         'normalize_user': normalize_user_name,
-        'generate_unique_file_id': generate_unique_file_id
     })
@@ -0,0 +1,62 @@
+import base64
+import time
+
+from ojs.cache import DiskCache
+from templates.template_functions import iterate_base64_encoded_data
+
+
+class DummyFile:
+    def __init__(self, url, data=None):
+        self.url = url
+        self.data = data
+
+
+class TestCache:
+    def test_put_and_get(self, tmp_path):
+        disk_cache = DiskCache(tmp_path)
+
+        assert disk_cache.get("10903392") is None
+        disk_cache.put("10903392", b"<mets/>")
+        assert disk_cache.get("10903392") == b"<mets/>"
+
+    def test_time_to_live(self, tmp_path):
+        disk_cache = DiskCache(tmp_path, time_to_live=0.01)
+        disk_cache.put("10903392", b"<mets/>")
+
+        time.sleep(0.05)
+        assert disk_cache.get("10903392") is None
+
+    def test_lru_eviction(self, tmp_path):
+        disk_cache = DiskCache(tmp_path, max_size=20)
+
+        disk_cache.put("first", b"x" * 10)
+        time.sleep(0.01)
+        disk_cache.put("second", b"x" * 10)
+        time.sleep(0.01)
+        assert disk_cache.get("first") is not None
+        time.sleep(0.01)
+        disk_cache.put("third", b"x" * 10)
+
+        assert disk_cache.get("first") is not None
+        assert disk_cache.get("second") is None
+        assert disk_cache.get("third") is not None
+
+    def test_file_data_from_cache(self, tmp_path):
+        disk_cache = DiskCache(tmp_path)
+        file_url = "https://example.org/download/10903392.pdf"
+        disk_cache.put("file:{url}".format(url=file_url), b"This should be a PDF!")
+
+        base64_data = "".join(
+            iterate_base64_encoded_data(
+                DummyFile(file_url), file_data_source=disk_cache
+            )
+        )
+        assert base64_data == base64.b64encode(b"This should be a PDF!").decode()
+
+        # Already loaded data has precedence over the cache
+        base64_data = "".join(
+            iterate_base64_encoded_data(
+                DummyFile(file_url, data=b"Loaded"), file_data_source=disk_cache
+            )
+        )
+        assert base64_data == base64.b64encode(b"Loaded").decode()
@@ -25,7 +25,7 @@ class TestConfigurator:
 
         languages = ["de_DE", "en_US"]
         assert parameters_in_python_format["languages"] == languages
-        assert parameters_in_python_format["items"] == {"10812612", "10773114"}
+        assert list(parameters_in_python_format["items"]) == ["10812612", "10773114"]
 
         template_confguration = parameters_in_python_format[
             Configurator.SECTION_TEMPLATES
@@ -0,0 +1,127 @@
+import gzip
+import json
+import lzma
+
+import pytest
+from VisualLibrary import VisualLibrary
+
+from ojs.exporter import SUMMARY_FILE_NAME, get_output_file_name, main, open_output_file
+from tests.test_Configurator import TEST_DATA_DIRECTORY
+
+XML_STRING = '<?xml version="1.0" ?>\n<issues>Ä</issues>'
+# A configuration without the items, they are given with `--items`
+CONFIGURATION_WITHOUT_ITEMS = """[General]
+languages = ["de_DE", "en_US"]
+
+[Templates]
+user_group_reference_label = Autor/in
+article_text_genre_label = Artikeltext
+file_uploading_ojs_user = ojs_admin
+article_reference_label = ART
+dummy_mail_address = dummy@mail.com
+file_embedding = href
+pretty = none
+"""
+
+
+class TestExporter:
+    def test_compressed_output_files(self, tmp_path):
+        for compression, open_compressed_file in [
+            ("gzip", gzip.open),
+            ("xz", lzma.open),
+        ]:
+            file_path = tmp_path / get_output_file_name("10802368", compression)
+            with open_output_file(file_path, compression) as output_file:
+                output_file.write(XML_STRING)
+
+            with open_compressed_file(
+                str(file_path), "rt", encoding="utf-8"
+            ) as xml_file:
+                assert xml_file.read() == XML_STRING
+
+        assert get_output_file_name("10802368") == "10802368.xml"
+        assert get_output_file_name("10802368", "gzip") == "10802368.xml.gz"
+
+        with pytest.raises(ValueError):
+            open_output_file(tmp_path / "10802368.xml.bz2", "bzip2")
+
+    def test_items_given_on_the_command_line(self, tmp_path, export_test_article):
+        item_file_path = tmp_path / "items.jsonl"
+        item_file_path.write_text('{"id": "10903392"}\n"10803150"\n10903392\n')
+
+        exit_code, output_directory = export_test_article(
+            "--items", str(item_file_path), "--jobs", "2", "--executor", "thread"
+        )
+
+        with open(str(output_directory / SUMMARY_FILE_NAME)) as summary_file:
+            summary = json.load(summary_file)
+        assert [item["error"] for item in summary["items"]] == [None, None]
+        assert [item["item_id"] for item in summary["items"]] == [
+            "10903392",
+            "10803150",
+        ]
+        assert exit_code == 0
+
+    @pytest.mark.parametrize("jobs, memory_is_traced", [("1", True), ("2", False)])
+    def test_memory_tracing_with_threads(
+        self, tmp_path, export_test_article, jobs, memory_is_traced
+    ):
+        item_file_path = tmp_path / "items.txt"
+        item_file_path.write_text("10903392\n10803150\n")
+        metrics_file_path = tmp_path / "metrics.jsonl"
+
+        exit_code, _ = export_test_article(
+            "--items",
+            str(item_file_path),
+            "--jobs",
+            jobs,
+            "--executor",
+            "thread",
+            "--metrics-file",
+            str(metrics_file_path),
+            "--trace-memory",
+        )
+
+        with open(str(metrics_file_path)) as metrics_file:
+            measurements = [json.loads(line) for line in metrics_file]
+        assert measurements
+        assert all(
+            (measurement["peak_memory"] is not None) == memory_is_traced
+            for measurement in measurements
+        )
+        assert exit_code == 0
+
+    @pytest.fixture
+    def export_test_article(self, tmp_path, monkeypatch):
+        """Returns a function running the exporter with the given arguments, exporting the test article
+        for every item. It returns the exit code and the output directory.
+        """
+
+        xml_test_file = "{base_dir}/generator-test-article.xml".format(
+            base_dir=TEST_DATA_DIRECTORY
+        )
+        monkeypatch.setattr(
+            VisualLibrary,
+            "get_element_for_id",
+            lambda visual_library, item_id: visual_library.get_element_from_xml_file(
+                xml_test_file
+            ),
+        )
+
+        configuration_file_path = tmp_path / "config.ini"
+        configuration_file_path.write_text(CONFIGURATION_WITHOUT_ITEMS)
+        output_directory = tmp_path / "xml"
+
+        def export(*arguments):
+            exit_code = main(
+                [
+                    "--config",
+                    str(configuration_file_path),
+                    "--output-directory",
+                    str(output_directory),
+                ]
+                + list(arguments)
+            )
+            return exit_code, output_directory
+
+        return export
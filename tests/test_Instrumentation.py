@@ -0,0 +1,71 @@
+import json
+
+from VisualLibrary import VisualLibrary
+
+from ojs.instrumentation import (
+    STAGE_CONSTRUCTION,
+    STAGE_PRETTY_PRINT,
+    STAGE_RENDER,
+    Instrumentation,
+    JsonLinesSink,
+)
+from ojs.xmlgenerator import OjsXmlGenerator
+from tests.test_XmlGeneration import (
+    TEST_DATA_DIRECTORY,
+    MockConfigurator,
+    add_dummy_data_to_all_articles,
+)
+
+
+class TestInstrumentation:
+    def test_measurement_of_xml_generation(self):
+        xml_test_file = "{base_dir}/generator-test-issue.xml".format(
+            base_dir=TEST_DATA_DIRECTORY
+        )
+        measurements = []
+        instrumentation = Instrumentation([measurements.append], trace_memory=True)
+
+        ojs_xml_generator = OjsXmlGenerator(MockConfigurator(), instrumentation)
+        ojs_issue = ojs_xml_generator.convert_vl_objecto_to_ojs_object(
+            VisualLibrary().get_element_from_xml_file(xml_test_file)
+        )
+        add_dummy_data_to_all_articles(ojs_issue.articles)
+        xml_string = ojs_issue.generate_xml()
+
+        assert [measurement.stage for measurement in measurements] == [
+            STAGE_CONSTRUCTION,
+            STAGE_RENDER,
+            STAGE_PRETTY_PRINT,
+        ]
+        assert all(measurement.item_id == "10802368" for measurement in measurements)
+        assert all(measurement.duration >= 0 for measurement in measurements)
+        assert all(measurement.peak_memory > 0 for measurement in measurements)
+        assert measurements[-1].bytes_produced == len(xml_string.encode("utf-8"))
+
+    def test_json_lines_sink(self, tmp_path):
+        metrics_file_path = tmp_path / "metrics.jsonl"
+        instrumentation = Instrumentation([JsonLinesSink(metrics_file_path)])
+
+        class Item:
+            id = "10802368"
+
+        for _ in range(2):
+            with instrumentation.measure(STAGE_RENDER, Item()) as stage:
+                stage.add_output("<issues>ä</issues>")
+
+        with open(str(metrics_file_path), "r") as metrics_file:
+            records = [json.loads(line) for line in metrics_file]
+
+        assert len(records) == 2
+        assert records[0]["item_id"] == "10802368"
+        assert records[0]["item_type"] == "Item"
+        assert records[0]["bytes_produced"] == 19
+        assert records[0]["peak_memory"] is None
+
+    def test_disabled_instrumentation(self):
+        instrumentation = Instrumentation()
+
+        with instrumentation.measure(STAGE_RENDER, object()) as stage:
+            stage.add_output("<issues/>")
+
+        assert stage.bytes_produced is None
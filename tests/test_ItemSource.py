@@ -0,0 +1,36 @@
+import pytest
+
+from configuration.ItemSource import ItemSource
+
+
+class TestItemSource:
+    @pytest.mark.parametrize(
+        "item_list_string",
+        [
+            '[\n    "10812612",\n    "10773114",\n    "10812612"\n]',
+            "10812612, 10773114\n10812612",
+            '# Comments are skipped\n"10812612"\n10773114\n\n{"id": "10812612"}',
+        ],
+    )
+    def test_items_in_order_without_duplicates(self, item_list_string):
+        item_source = ItemSource.from_string(item_list_string)
+
+        assert list(item_source) == ["10812612", "10773114"]
+
+    def test_item_file_is_streamed(self, tmp_path):
+        item_file_path = tmp_path / "items.txt"
+        item_file_path.write_text("3\n1\n2\n1\n")
+        item_source = ItemSource.from_file(item_file_path)
+
+        item_ids = iter(item_source)
+        assert next(item_ids) == "3"
+        assert list(item_ids) == ["1", "2"]
+        # The file is read again on every iteration
+        assert list(item_source) == ["3", "1", "2"]
+
+    def test_empty_item_file(self, tmp_path):
+        item_file_path = tmp_path / "items.txt"
+        item_file_path.write_text("\n# No items yet\n")
+
+        with pytest.raises(ValueError):
+            list(ItemSource.from_file(item_file_path))
@@ -0,0 +1,58 @@
+from collections import namedtuple
+
+from ojs.journal import JournalExporter
+
+DummyJournal = namedtuple("DummyJournal", ["id", "volumes", "articles"])
+DummyVolume = namedtuple("DummyVolume", ["id", "issues", "articles"])
+
+
+class DummyElement:
+    def __init__(self, element_id):
+        self.id = element_id
+        self.is_standalone = False
+
+
+class DummyXmlGenerator:
+    def __init__(self):
+        self.converted_ids = []
+
+    def convert_vl_objecto_to_ojs_object(self, vl_object):
+        self.converted_ids.append(vl_object.id)
+        return vl_object
+
+
+class TestJournal:
+    def test_exportable_elements_of_journal(self):
+        volume_with_articles = DummyVolume("3", [], [DummyElement("31")])
+        standalone_article = DummyElement("4")
+        vl_journal = DummyJournal(
+            "1",
+            [
+                DummyVolume("2", [DummyElement("21"), DummyElement("22")], []),
+                volume_with_articles,
+            ],
+            [standalone_article],
+        )
+
+        exportable_elements = list(
+            JournalExporter.iterate_exportable_elements(vl_journal)
+        )
+
+        assert [element.id for element in exportable_elements] == [
+            "21",
+            "22",
+            "3",
+            "4",
+        ]
+        assert exportable_elements[2] is volume_with_articles
+        assert standalone_article.is_standalone
+
+    def test_lazy_conversion(self):
+        vl_journal = DummyJournal(
+            "1", [DummyVolume("2", [DummyElement("21"), DummyElement("22")], [])], []
+        )
+        xml_generator = DummyXmlGenerator()
+
+        ojs_objects = JournalExporter(xml_generator).iterate_ojs_objects(vl_journal)
+        assert next(ojs_objects).id == "21"
+        assert xml_generator.converted_ids == ["21"]
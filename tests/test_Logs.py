@@ -0,0 +1,22 @@
+import io
+import logging
+import queue
+
+from ojs.logs import LOGGER_NAME, start_logging, stop_logging
+
+
+class TestLogs:
+    def test_records_are_written_by_the_listener(self):
+        stream = io.StringIO()
+        logger = logging.getLogger("{name}.Test".format(name=LOGGER_NAME))
+
+        queue_listener = start_logging(queue.SimpleQueue(), "info", stream)
+        try:
+            logger.debug("Hidden %s", "message")
+            logger.info("Exported %d items", 3)
+        finally:
+            stop_logging(queue_listener)
+
+        assert "[INFO] - Exported 3 items" in stream.getvalue()
+        assert "Hidden" not in stream.getvalue()
+        assert logging.getLogger(LOGGER_NAME).propagate
@@ -0,0 +1,49 @@
+from VisualLibrary import VisualLibrary
+
+from ojs.manifest import ExportManifest, compute_content_hash
+from tests.test_XmlGeneration import TEST_DATA_DIRECTORY, MockConfigurator
+
+
+class TestManifest:
+    def test_content_hash(self):
+        xml_test_file = "{base_dir}/generator-test-article.xml".format(
+            base_dir=TEST_DATA_DIRECTORY
+        )
+        vl_article = VisualLibrary().get_element_from_xml_file(xml_test_file)
+        template_configuration = MockConfigurator().get_template_configuration()
+
+        content_hash = compute_content_hash(vl_article, template_configuration)
+        assert content_hash == compute_content_hash(vl_article, template_configuration)
+
+        changed_configuration = dict(template_configuration, pretty="lxml")
+        assert content_hash != compute_content_hash(vl_article, changed_configuration)
+
+    def test_content_hash_without_children(self):
+        class UnloadedIssue:
+            id = "10802368"
+            metadata = "<mets/>"
+            files = []
+
+            @property
+            def articles(self):
+                raise AssertionError("The articles must not be loaded for the hash!")
+
+        vl_issue = UnloadedIssue()
+        template_configuration = MockConfigurator().get_template_configuration()
+
+        assert compute_content_hash(vl_issue, template_configuration)
+
+    def test_manifest_persistence(self, tmp_path):
+        output_file = tmp_path / "10903392.xml"
+        output_file.write_text("<article/>")
+
+        manifest = ExportManifest(tmp_path)
+        assert manifest.get_content_hash("10903392") is None
+
+        manifest.record("10903392", "first-hash", [str(output_file)])
+        manifest.record("10903392", "second-hash", [str(output_file)])
+
+        assert ExportManifest(tmp_path).get_content_hash("10903392") == "second-hash"
+
+        output_file.unlink()
+        assert ExportManifest(tmp_path).get_content_hash("10903392") is None
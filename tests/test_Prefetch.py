@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import namedtuple
+
+from VisualLibrary import VisualLibrary
+
+from ojs.prefetch import FilePrefetcher, iterate_files_in_render_order
+from ojs.xmlgenerator import OjsXmlGenerator
+from templates.template_functions import FILE_DATA_SOURCE_VARIABLE_NAME
+from tests.test_XmlGeneration import (
+    TEST_DATA_DIRECTORY,
+    MockConfigurator,
+    add_dummy_data_to_all_articles,
+)
+
+DummyFile = namedtuple("DummyFile", ["name", "data"])
+
+
+class CountingDataSource:
+    def __init__(self):
+        self.read_files = []
+
+    def iterate_data(self, file, chunk_size):
+        self.read_files.append(file.name)
+        for start in range(0, len(file.data), 100):
+            yield file.data[start : start + 100]
+
+
+class TestPrefetch:
+    def test_prefetched_data(self):
+        files = [
+            DummyFile("file-{}".format(number), bytes([number]) * 1000)
+            for number in range(10)
+        ]
+        data_source = CountingDataSource()
+
+        with FilePrefetcher(
+            files, max_workers=3, max_in_flight_bytes=1500, file_data_source=data_source
+        ) as prefetcher:
+            time.sleep(0.1)
+            assert prefetcher._in_flight_bytes <= 1500
+
+            for file in files:
+                data = b"".join(prefetcher.iterate_data(file, chunk_size=300))
+                assert data == file.data
+
+            assert prefetcher._in_flight_bytes == 0
+
+            # Files are not kept after they were rendered
+            unknown_file = DummyFile("unknown", b"data")
+            assert b"".join(prefetcher.iterate_data(unknown_file)) == b"data"
+
+        assert sorted(data_source.read_files) == sorted(
+            [file.name for file in files] + ["unknown"]
+        )
+
+    def test_large_file_is_streamed(self):
+        large_file = DummyFile("large", bytes(range(100)) * 50)
+        first_chunk_read = threading.Event()
+        in_flight_bytes = []
+
+        class BlockingDataSource(CountingDataSource):
+            def iterate_data(self, file, chunk_size):
+                for number, data_chunk in enumerate(super().iterate_data(file, 0)):
+                    if number == 1:
+                        # The render gets the first chunk before the rest is downloaded
+                        assert first_chunk_read.wait(timeout=5)
+                    yield data_chunk
+
+        with FilePrefetcher(
+            [large_file],
+            max_workers=1,
+            max_in_flight_bytes=300,
+            file_data_source=BlockingDataSource(),
+        ) as prefetcher:
+            data_chunks = []
+            for data_chunk in prefetcher.iterate_data(large_file, chunk_size=100):
+                first_chunk_read.set()
+                time.sleep(0.001)
+                in_flight_bytes.append(prefetcher._in_flight_bytes)
+                data_chunks.append(data_chunk)
+
+            assert b"".join(data_chunks) == large_file.data
+            assert max(in_flight_bytes) <= 300 + 100
+            assert prefetcher._in_flight_bytes == 0
+
+    def test_prefetched_issue_xml(self):
+        xml_test_file = "{base_dir}/generator-test-issue.xml".format(
+            base_dir=TEST_DATA_DIRECTORY
+        )
+        ojs_xml_generator = OjsXmlGenerator(MockConfigurator())
+        vl_issue = VisualLibrary().get_element_from_xml_file(xml_test_file)
+
+        def create_ojs_issue():
+            ojs_issue = ojs_xml_generator.convert_vl_objecto_to_ojs_object(vl_issue)
+            add_dummy_data_to_all_articles(ojs_issue.articles)
+            return ojs_issue
+
+        expected_xml_string = create_ojs_issue().generate_xml()
+
+        ojs_issue = create_ojs_issue()
+        converted_vl_articles = []
+        convert_vl_article = ojs_issue.articles._convert_vl_object
+        ojs_issue.articles._convert_vl_object = lambda vl_article: (
+            converted_vl_articles.append(vl_article) or convert_vl_article(vl_article)
+        )
+        files = list(iterate_files_in_render_order(ojs_issue))
+        # The articles are not converted to find their files
+        assert not converted_vl_articles
+        ojs_issue.articles._convert_vl_object = convert_vl_article
+        assert files == [
+            file for article in ojs_issue.articles for file in article.submission_files
+        ]
+
+        with FilePrefetcher(files, max_workers=2, max_in_flight_bytes=1) as prefetcher:
+            ojs_issue.add_variable_to_template_configuration(
+                FILE_DATA_SOURCE_VARIABLE_NAME, prefetcher
+            )
+            assert ojs_issue.generate_xml() == expected_xml_string
+
+    def test_prefetch_order_of_volume(self):
+        ojs_xml_generator = OjsXmlGenerator(MockConfigurator())
+        vl_volume = VisualLibrary().get_element_for_id("10801960")
+        ojs_volume = ojs_xml_generator.convert_vl_objecto_to_ojs_object(vl_volume)
+
+        files = list(iterate_files_in_render_order(ojs_volume))
+
+        expected_files = []
+        for ojs_issue in ojs_volume.issues:
+            if ojs_issue.teaser_image_file is not None:
+                expected_files.append(ojs_issue.teaser_image_file)
+            for article in ojs_issue.articles:
+                expected_files.extend(article.submission_files)
+        assert files
+        assert files == expected_files
@@ -0,0 +1,55 @@
+import base64
+import types
+
+import pytest
+
+from templates.template_functions import iterate_base64_encoded_data
+
+
+class UnevenDataSource:
+    """Returns the data of a file in chunks of the given sizes, ignoring the requested chunk size."""
+
+    def __init__(self, data: bytes, read_sizes):
+        self.data = data
+        self.read_sizes = read_sizes
+
+    def iterate_data(self, file, chunk_size):
+        start = 0
+        while start < len(self.data):
+            for read_size in self.read_sizes:
+                yield self.data[start : start + read_size]
+                start += read_size
+
+
+class TestTemplateFunctions:
+    @pytest.mark.parametrize("data_size", [0, 1, 2, 3, 4, 5, 6, 7, 100, 101, 102])
+    @pytest.mark.parametrize("chunk_size", [3, 6, 12])
+    def test_base64_chunks_of_file_data(self, tmp_path, data_size, chunk_size):
+        data = bytes(range(256)) * 2
+        data = data[:data_size]
+        local_file_path = tmp_path / "file.pdf"
+        local_file_path.write_bytes(data)
+
+        for file in (
+            types.SimpleNamespace(data=data),
+            types.SimpleNamespace(local_path=str(local_file_path)),
+        ):
+            base64_chunks = list(iterate_base64_encoded_data(file, chunk_size))
+
+            assert "".join(base64_chunks) == base64.b64encode(data).decode()
+            # Only the last chunk may be padded, all others encode a multiple of 3 bytes
+            assert not any("=" in base64_chunk for base64_chunk in base64_chunks[:-1])
+
+    @pytest.mark.parametrize("data_size", [1, 2, 10, 100, 101])
+    @pytest.mark.parametrize("read_sizes", [[1], [2], [4, 5], [1, 7, 2]])
+    def test_base64_chunks_crossing_read_boundaries(self, data_size, read_sizes):
+        data = bytes(range(data_size))
+        file_data_source = UnevenDataSource(data, read_sizes)
+
+        base64_data = "".join(
+            iterate_base64_encoded_data(
+                types.SimpleNamespace(), file_data_source=file_data_source
+            )
+        )
+
+        assert base64_data == base64.b64encode(data).decode()
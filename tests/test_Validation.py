@@ -0,0 +1,38 @@
+import gzip
+import os
+
+import pytest
+from lxml import etree
+
+from ojs.validation import get_ojs_native_schema, validate_xml_file
+
+this_files_directory = os.path.dirname(os.path.realpath(__file__))
+TEST_DATA_DIRECTORY = "{base_dir}/data".format(base_dir=this_files_directory)
+
+
+class TestValidation:
+    def test_streaming_validation(self, tmp_path):
+        xml_file_path = "{base_dir}/generator-test-issue-outcome.xml".format(
+            base_dir=TEST_DATA_DIRECTORY
+        )
+        validate_xml_file(xml_file_path)
+
+        with open(xml_file_path, "rb") as xml_file:
+            xml_bytes = xml_file.read()
+
+        compressed_xml_file_path = tmp_path / "issue.xml.gz"
+        with gzip.open(str(compressed_xml_file_path), "wb") as compressed_xml_file:
+            compressed_xml_file.write(xml_bytes)
+        with gzip.open(str(compressed_xml_file_path), "rb") as compressed_xml_file:
+            validate_xml_file(compressed_xml_file)
+
+        invalid_xml_file_path = tmp_path / "invalid-issue.xml"
+        invalid_xml_file_path.write_bytes(
+            xml_bytes.replace(b"</articles>", b"<unknown/></articles>")
+        )
+        with pytest.raises(etree.XMLSyntaxError):
+            validate_xml_file(invalid_xml_file_path)
+
+    def test_schemas_compiled_once(self):
+        assert get_ojs_native_schema() is get_ojs_native_schema()
+        assert get_ojs_native_schema(True) is not get_ojs_native_schema()
@@ -1,13 +1,17 @@
 import datetime
+import io
 import os
 import pathlib
+import types
+from unittest import mock
 
 import pytest
 from bs4 import BeautifulSoup as Soup
 from lxml import etree
-from VisualLibrary import VisualLibrary
+from VisualLibrary import VisualLibrary, Volume
 
 from configuration.Configurator import Configurator
+from ojs.validation import validate_xml_string
 from ojs.xmlgenerator import OjsArticle, OjsIssue, OjsXmlGenerator
 
 this_files_directory = os.path.dirname(os.path.realpath(__file__))
@@ -96,10 +100,15 @@ class TestXmlGeneration:
         author = ojs_article.authors[0]
         assert author.given_name == "Werner"
         assert author.family_name == "Paeckelmann"
+        assert author.id == 1
 
         ojs_article.abstract = "Das ist eine Zusammenfassung des Textes."
         ojs_article.doi = "https://doi.org/10.1234/test.123"
         ojs_article.keywords = ["test", "some strange keyword", "another-keyword"]
+        assert (
+            ojs_article.get_localized_fields("de_DE").abstract
+            == "Das ist eine Zusammenfassung des Textes."
+        )
 
         add_dummy_submission_file_data(ojs_article.submission_files)
 
@@ -305,6 +314,10 @@ class TestXmlGeneration:
         )
         assert german_publication.find("prefix") is None
 
+        # The language is added to the generated document only, not to the shared configuration
+        assert ojs_article.languages == ("de_DE", "en_US")
+        assert configurator.get_template_configuration()["languages"] == ["de_DE"]
+
         vl_article, xml_generator = create_vl_object_and_xml_generator(
             article_id, pre_3_2_schema=True
         )
@@ -345,6 +358,29 @@ class TestXmlGeneration:
             "Arbeiten von Ferdinand Pax ..."
         )
 
+    def test_volume_without_issues_with_title(self, visual_library):
+        xml_test_file = "{base_dir}/generator-test-issue.xml".format(
+            base_dir=TEST_DATA_DIRECTORY
+        )
+        configurator = MockConfigurator()
+        configurator.change_configuration_value("add_title_to_issue", True)
+        ojs_xml_generator = OjsXmlGenerator(configurator)
+
+        vl_volume = create_vl_volume_without_issues(
+            visual_library.get_element_from_xml_file(xml_test_file).articles
+        )
+        ojs_volume = ojs_xml_generator.convert_vl_objecto_to_ojs_object(vl_volume)
+        add_dummy_data_to_all_articles(ojs_volume.articles)
+
+        volume_xml_string = ojs_volume.generate_xml()
+        validate_ojs_native_xsd_consistency(volume_xml_string)
+
+        issue_details = Soup(volume_xml_string, "lxml").issue_identification
+        assert issue_details.volume.text == "101"
+        for language in ["de_DE", "en_US"]:
+            issue_title = issue_details.find("title", {"locale": language})
+            assert issue_title.text == "Band 101 : Festschrift"
+
     def test_multilanguage_titles(self):
         issue_id = "10804777"
         vl_issue, xml_generator = create_vl_object_and_xml_generator(
@@ -398,6 +434,43 @@ class TestXmlGeneration:
         assert multi_language_article.find("subtitle", {"locale": "en_US"}) is None
         assert multi_language_article.find("prefix", {"locale": "en_US"}).text == "The"
 
+    def test_title_prefixes_per_locale(self, visual_library):
+        xml_test_file = "{base_dir}/generator-test-article.xml".format(
+            base_dir=TEST_DATA_DIRECTORY
+        )
+        vl_article = visual_library.get_element_from_xml_file(xml_test_file)
+
+        configurator = MockConfigurator()
+        configurator.change_configuration_value(
+            Configurator.KEYWORD_TITLE_PREFIXES, {"de_DE": ["der", "das"]}
+        )
+        ojs_article = OjsXmlGenerator(configurator).convert_vl_objecto_to_ojs_object(
+            vl_article
+        )
+        assert ojs_article.prefix is None
+        assert ojs_article.title.startswith("Die Flinzschiefer")
+
+        prefixes, titles = ojs_article._split_title_prefix(
+            {
+                "de_DE": "Der Rhein",
+                "en_US": "The Rhine",
+                "fr_FR": "Le Rhin",
+                None: "Le Rhin",
+            }
+        )
+        assert prefixes == {"de_DE": "Der", "en_US": "The", "fr_FR": "Le", None: "Le"}
+        assert titles == {
+            "de_DE": "Rhein",
+            "en_US": "Rhine",
+            "fr_FR": "Rhin",
+            None: "Rhin",
+        }
+        # Only the prefix words of the title's locale apply
+        assert ojs_article._split_title_prefix({"en_US": "Die Hard"}) == (
+            {"en_US": None},
+            {"en_US": "Die Hard"},
+        )
+
     def test_inclusion_of_teaser_image(self):
         issue_id = "12543583"
         vl_issue, xml_generator = create_vl_object_and_xml_generator(issue_id)
@@ -407,6 +480,257 @@ class TestXmlGeneration:
         assert "<cover>" in generated_volume_xml_string
         assert "<cover_image>cover_issue_12543583.jpg</cover_image>" in generated_volume_xml_string
 
+    def test_streamed_xml_generation(self, visual_library):
+        xml_test_file = "{base_dir}/generator-test-issue.xml".format(
+            base_dir=TEST_DATA_DIRECTORY
+        )
+
+        ojs_xml_generator = OjsXmlGenerator(MockConfigurator())
+
+        streamed_xml = io.StringIO()
+        ojs_issue = ojs_xml_generator.convert_vl_objecto_to_ojs_object(
+            visual_library.get_element_from_xml_file(xml_test_file)
+        )
+        for article in ojs_issue.articles:
+            add_dummy_submission_file_data(article.submission_files)
+        ojs_issue.generate_xml_to(streamed_xml)
+        streamed_xml_string = streamed_xml.getvalue()
+
+        assert all(line.strip() for line in streamed_xml_string.split("\n"))
+        assert normalize_xml_whitespace(
+            streamed_xml_string
+        ) == normalize_xml_whitespace(self.get_expectation_xml_string(xml_test_file))
+
+        validate_ojs_native_xsd_consistency(streamed_xml_string)
+
+    @pytest.mark.parametrize("pretty_printer", ["lxml", "none"])
+    def test_pretty_printers(self, visual_library, pretty_printer):
+        xml_test_file = "{base_dir}/generator-test-issue.xml".format(
+            base_dir=TEST_DATA_DIRECTORY
+        )
+
+        configurator = MockConfigurator()
+        ojs_xml_generator = OjsXmlGenerator(configurator)
+
+        def generate_issue_xml(pretty):
+            configurator.change_configuration_value("pretty", pretty)
+            ojs_issue = ojs_xml_generator.convert_vl_objecto_to_ojs_object(
+                visual_library.get_element_from_xml_file(xml_test_file)
+            )
+            add_dummy_data_to_all_articles(ojs_issue.articles)
+            return ojs_issue.generate_xml()
+
+        assert normalize_xml_whitespace(
+            generate_issue_xml(pretty_printer)
+        ) == normalize_xml_whitespace(generate_issue_xml("minidom"))
+
+        configurator.change_configuration_value("pretty", "fancy")
+        with pytest.raises(ValueError):
+            OjsIssue(template_configuration=configurator.get_template_configuration())
+
+    @pytest.mark.parametrize("pre_3_2_schema", [False, True])
+    @pytest.mark.parametrize("as_volume", [False, True])
+    def test_lxml_renderer(self, visual_library, pre_3_2_schema, as_volume):
+        xml_test_file = "{base_dir}/generator-test-issue.xml".format(
+            base_dir=TEST_DATA_DIRECTORY
+        )
+
+        configurator = MockConfigurator()
+        configurator.change_configuration_value("use_pre_3_2_schema", pre_3_2_schema)
+        configurator.change_configuration_value("add_title_to_issue", True)
+        ojs_xml_generator = OjsXmlGenerator(configurator)
+
+        def generate_issue_xml(renderer, streamed=False):
+            configurator.change_configuration_value("renderer", renderer)
+            vl_object = visual_library.get_element_from_xml_file(xml_test_file)
+            if as_volume:
+                vl_object = create_vl_volume_without_issues(vl_object.articles)
+            ojs_issue = ojs_xml_generator.convert_vl_objecto_to_ojs_object(vl_object)
+            add_dummy_data_to_all_articles(ojs_issue.articles)
+
+            if not streamed:
+                return ojs_issue.generate_xml()
+
+            streamed_xml = io.StringIO()
+            ojs_issue.generate_xml_to(streamed_xml)
+            return streamed_xml.getvalue()
+
+        template_xml_string = generate_issue_xml("jinja")
+        for xml_string in [
+            generate_issue_xml("lxml"),
+            generate_issue_xml("lxml", streamed=True),
+        ]:
+            assert normalize_xml_whitespace(xml_string) == normalize_xml_whitespace(
+                template_xml_string
+            )
+            validate_ojs_native_xsd_consistency(
+                xml_string, pre_ojs32_schema=pre_3_2_schema
+            )
+
+        configurator.change_configuration_value("renderer", "mako")
+        with pytest.raises(ValueError):
+            OjsIssue(template_configuration=configurator.get_template_configuration())
+
+    def test_file_embedding_in_external_directory(self, visual_library, tmp_path):
+        xml_test_file = "{base_dir}/generator-test-issue.xml".format(
+            base_dir=TEST_DATA_DIRECTORY
+        )
+        file_directory = tmp_path / "files"
+
+        configurator = MockConfigurator()
+        configurator.change_configuration_value("file_embedding", "external-dir")
+        configurator.change_configuration_value("file_directory", str(file_directory))
+        configurator.change_configuration_value(
+            "file_base_url", "https://example.org/files/"
+        )
+
+        ojs_xml_generator = OjsXmlGenerator(configurator)
+        ojs_issue = ojs_xml_generator.convert_vl_objecto_to_ojs_object(
+            visual_library.get_element_from_xml_file(xml_test_file)
+        )
+        add_dummy_data_to_all_articles(ojs_issue.articles)
+
+        result_xml_string = ojs_issue.generate_xml()
+        validate_ojs_native_xsd_consistency(result_xml_string)
+
+        xml_soup = Soup(result_xml_string, "lxml")
+        assert not xml_soup.find_all("embed")
+
+        file_references = [node["src"] for node in xml_soup.find_all("href")]
+        assert file_references
+        for file_reference in file_references:
+            assert file_reference.startswith("https://example.org/files/")
+            stored_file_path = file_directory / file_reference.rsplit("/", 1)[-1]
+            assert stored_file_path.read_bytes() == b"This should be a PDF!"
+
+    def test_shared_template_environment(self, visual_library):
+        xml_test_file = "{base_dir}/generator-test-issue.xml".format(
+            base_dir=TEST_DATA_DIRECTORY
+        )
+
+        ojs_xml_generator = OjsXmlGenerator(MockConfigurator())
+        ojs_issue = ojs_xml_generator.convert_vl_objecto_to_ojs_object(
+            visual_library.get_element_from_xml_file(xml_test_file)
+        )
+
+        assert all(
+            article.template_environment is ojs_issue.template_environment
+            for article in ojs_issue.articles
+        )
+
+    def test_lazy_article_conversion(self, visual_library):
+        xml_test_file = "{base_dir}/generator-test-issue.xml".format(
+            base_dir=TEST_DATA_DIRECTORY
+        )
+
+        ojs_xml_generator = OjsXmlGenerator(MockConfigurator())
+        ojs_issue = ojs_xml_generator.convert_vl_objecto_to_ojs_object(
+            visual_library.get_element_from_xml_file(xml_test_file)
+        )
+
+        assert len(ojs_issue.articles) == 10
+        assert ojs_issue.articles[0].id == next(iter(ojs_issue.articles)).id
+        # No converted article is kept by the issue
+        assert ojs_issue.articles[0] is not ojs_issue.articles[0]
+        assert [article.id for article in ojs_issue.articles] == [
+            article.id for article in ojs_issue.articles
+        ]
+
+    def test_reproducible_file_ids(self, visual_library):
+        xml_test_file = "{base_dir}/generator-test-issue.xml".format(
+            base_dir=TEST_DATA_DIRECTORY
+        )
+
+        configurator = MockConfigurator()
+        ojs_xml_generator = OjsXmlGenerator(configurator)
+
+        def generate_issue_xml():
+            ojs_issue = ojs_xml_generator.convert_vl_objecto_to_ojs_object(
+                visual_library.get_element_from_xml_file(xml_test_file)
+            )
+            add_dummy_data_to_all_articles(ojs_issue.articles)
+            return ojs_issue.generate_xml()
+
+        assert generate_issue_xml() == generate_issue_xml()
+
+        configurator.change_configuration_value("namespace_file_ids", True)
+        xml_soup = Soup(generate_issue_xml(), "lxml")
+        file_ids = [node["file_id"] for node in xml_soup.find_all("submission_file")]
+        assert file_ids[:2] == ["108023681", "108023682"]
+
+    def test_precomputed_issue_fields(self, visual_library):
+        xml_test_file = "{base_dir}/generator-test-issue.xml".format(
+            base_dir=TEST_DATA_DIRECTORY
+        )
+        ojs_xml_generator = OjsXmlGenerator(MockConfigurator())
+        ojs_issue = ojs_xml_generator.convert_vl_objecto_to_ojs_object(
+            visual_library.get_element_from_xml_file(xml_test_file)
+        )
+
+        ojs_issue.title = {"de_DE": "Heft 1", "en_US": "Issue 1"}
+        ojs_issue.date_modified = datetime.datetime(2020, 6, 5, 10, 40, 19)
+        ojs_issue.files = [
+            types.SimpleNamespace(
+                mime_type="application/pdf",
+                date_uploaded="2020-06-05",
+                date_modified=datetime.datetime(2020, 6, 6, 8, 0),
+            )
+        ]
+
+        assert ojs_issue.get_localized_fields("en_US").title == "Issue 1"
+        assert ojs_issue.iso_date_modified == "2020-06-05"
+        assert ojs_issue.galleys[0].label == "PDF"
+        assert ojs_issue.galleys[0].date_uploaded == "2020-06-05"
+        assert ojs_issue.galleys[0].date_modified == "2020-06-06"
+
+    def test_splitting_of_issue_into_documents(self, visual_library):
+        xml_test_file = "{base_dir}/generator-test-issue.xml".format(
+            base_dir=TEST_DATA_DIRECTORY
+        )
+        max_document_size = 10000
+
+        ojs_xml_generator = OjsXmlGenerator(MockConfigurator())
+        ojs_issue = ojs_xml_generator.convert_vl_objecto_to_ojs_object(
+            visual_library.get_element_from_xml_file(xml_test_file)
+        )
+        add_dummy_data_to_all_articles(ojs_issue.articles)
+
+        xml_documents = list(ojs_issue.generate_xml_documents(max_document_size))
+        assert len(xml_documents) > 1
+
+        article_count = 0
+        for xml_document in xml_documents:
+            assert len(xml_document.encode("utf-8")) <= max_document_size
+            validate_ojs_native_xsd_consistency(xml_document)
+
+            xml_soup = Soup(xml_document, "lxml")
+            assert xml_soup.find("issue").find("id").text == "10802368"
+            article_count += len(xml_soup.find_all("article"))
+
+        assert article_count == 10
+
+    def test_cover_only_in_first_document_of_split_issue(self, visual_library):
+        xml_test_file = "{base_dir}/generator-test-issue.xml".format(
+            base_dir=TEST_DATA_DIRECTORY
+        )
+        max_document_size = 16000
+
+        ojs_xml_generator = OjsXmlGenerator(MockConfigurator())
+        ojs_issue = ojs_xml_generator.convert_vl_objecto_to_ojs_object(
+            visual_library.get_element_from_xml_file(xml_test_file)
+        )
+        add_dummy_data_to_all_articles(ojs_issue.articles)
+        # The base64 encoded cover takes more than a third of every document
+        ojs_issue.teaser_image_file = types.SimpleNamespace(data=bytes(4500))
+
+        xml_documents = list(ojs_issue.generate_xml_documents(max_document_size))
+        assert len(xml_documents) > 2
+
+        for document_index, xml_document in enumerate(xml_documents):
+            assert len(xml_document.encode("utf-8")) <= max_document_size
+            assert ("<cover>" in xml_document) == (document_index == 0)
+            validate_ojs_native_xsd_consistency(xml_document)
+
     def get_expectation_xml_string(self, test_file_path):
         input_file_path = pathlib.Path(test_file_path)
         output_file_path = input_file_path.parent / "{file_name}-outcome.xml".format(
@@ -439,36 +763,34 @@ def create_vl_object_and_xml_generator(vl_id, pre_3_2_schema=False):
     return vl_object, ojs_xml_generator
 
 
+def create_vl_volume_without_issues(vl_articles):
+    """Returns a Visual Library volume with a title, which contains the given articles directly."""
+    return mock.Mock(
+        spec=Volume,
+        id="10801960",
+        number="101 AB",
+        publication_date="1942",
+        title="Band 101",
+        subtitle="Festschrift",
+        issues=[],
+        articles=vl_articles,
+    )
+
+
 def add_dummy_data_to_all_articles(articles):
     for article in articles:
         add_dummy_submission_file_data(article.submission_files)
 
 
 def validate_ojs_native_xsd_consistency(xml_string, pre_ojs32_schema=False):
-    xsd_files_path = "{base_dir}/xsd".format(base_dir=TEST_DATA_DIRECTORY)
-
-    if pre_ojs32_schema:
-        xsd_files_path = "{xsd_files_path}/3.1.2-1".format(
-            xsd_files_path=xsd_files_path
-        )
-
-    ojs_native_xsd_file_path = "{xsd_path}/ojs-native.xsd".format(
-        xsd_path=xsd_files_path
-    )
-
-    current_dir = os.curdir
-    os.chdir(xsd_files_path)
-    with open(ojs_native_xsd_file_path, "r") as xsd_file:
-        ojs_native_xsd = xsd_file.read()
-    os.chdir(current_dir)
-
-    schema_root = etree.XML(ojs_native_xsd)
-    xml_schema = etree.XMLSchema(schema_root)
+    # Raises an exception when validation fails
+    validate_xml_string(xml_string, use_pre_3_2_schema=pre_ojs32_schema)
 
-    xml_parser = etree.XMLParser(schema=xml_schema)
 
-    # Raises an exception when validation fails
-    etree.fromstring(xml_string, xml_parser)
+def normalize_xml_whitespace(xml_string):
+    """Returns the XML string without any whitespace between tags, to compare differently indented XML."""
+    xml_parser = etree.XMLParser(remove_blank_text=True)
+    return etree.tostring(etree.fromstring(xml_string.encode(), xml_parser))
 
 
 def add_dummy_submission_file_data(submission_files):